@@ -13,10 +13,14 @@ from .viral_topics import (
     VIRAL_TOPICS,
     BORING_TOPICS,
     TOPIC_WEIGHTS,
+    VIRAL_SIGNALS,
+    BORING_KEYWORDS,
     is_socially_viral,
     calculate_viral_score
 )
 
+from .analysis import SENTIMENT_BACKEND
+
 __all__ = [
     'ACTIVE_COUNTRIES',
     'COUNTRIES',
@@ -27,6 +31,9 @@ __all__ = [
     'VIRAL_TOPICS',
     'BORING_TOPICS',
     'TOPIC_WEIGHTS',
+    'VIRAL_SIGNALS',
+    'BORING_KEYWORDS',
     'is_socially_viral',
-    'calculate_viral_score'
+    'calculate_viral_score',
+    'SENTIMENT_BACKEND'
 ]
@@ -0,0 +1,7 @@
+"""Article analysis settings"""
+
+# Sentiment backend used by news_analyzer:
+#   'textblob' - TextBlob's pattern analyzer, one article at a time (default)
+#   'lexicon'  - the same polarity lexicon scored in NumPy batches (src/lexicon_sentiment.py),
+#                much faster; compare with scripts/benchmark_sentiment.py before switching
+SENTIMENT_BACKEND = 'textblob'
@@ -67,7 +67,29 @@ TOPIC_WEIGHTS = {
     'Other': 1
 }
 
-def calculate_viral_score(headline, summary):
+# Viral score signals: (name, points, keywords). A signal scores once if any keyword appears.
+VIRAL_SIGNALS = [
+    ('personal_impact', 10, ['your', 'you', 'families', 'people', 'we', 'us']),
+    ('big_numbers', 5, ['billion', 'million', 'thousands', 'hundreds of']),
+    ('records', 15, ['record', 'highest ever', 'lowest', 'worst', 'best', 'unprecedented']),
+    ('emotion', 8, ['crisis', 'shock', 'scandal', 'outrage', 'fury', 'slams']),
+    ('villains', 6, ['ceo', 'company', 'corporation', 'boss', 'executive']),
+    ('money', 10, ['£', '$', 'cost', 'price', 'expensive', 'cheap']),
+    ('conflict', 7, ['vs', 'versus', 'battle', 'fight', 'war', 'clash']),
+    ('viral_people', 12, [
+        'elon musk', 'bezos', 'zuckerberg', 'prince harry', 'meghan',
+        'mrbeast', 'andrew tate', 'kardashian', 'trump', 'biden'
+    ])
+]
+
+# Boring topic keywords (heavy penalty)
+BORING_KEYWORDS = [
+    'earnings', 'quarterly', 'analyst', 'forecast', 'outlook',
+    'rating', 'upgrade', 'downgrade', 'consensus', 'eps'
+]
+BORING_PENALTY = 20
+
+def calculate_viral_score(headline, summary, signals=None):
     """
     Calculate viral engagement score (0-100)
     Threshold: >= 5 to be considered for posting
@@ -75,56 +97,23 @@ def calculate_viral_score(headline, summary):
     Args:
         headline: Article headline
         summary: Article summary/description
+        signals: Optional names of the signals already found in the text
+                 (e.g. by the shared keyword matcher, 'boring' for the penalty)
 
     Returns:
         float: Score between 0-100
     """
-    text = f"{headline} {summary}".lower()
-    score = 0
-
-    # Personal impact (+10)
-    if any(word in text for word in ['your', 'you', 'families', 'people', 'we', 'us']):
-        score += 10
-
-    # Big numbers (+5)
-    if any(word in text for word in ['billion', 'million', 'thousands', 'hundreds of']):
-        score += 5
-
-    # Records (+15)
-    if any(word in text for word in ['record', 'highest ever', 'lowest', 'worst', 'best', 'unprecedented']):
-        score += 15
+    if signals is None:
+        text = f"{headline} {summary}".lower()
+        signals = {name for name, _, words in VIRAL_SIGNALS if any(word in text for word in words)}
+        if any(keyword in text for keyword in BORING_KEYWORDS):
+            signals.add('boring')
 
-    # Emotion words (+8)
-    if any(word in text for word in ['crisis', 'shock', 'scandal', 'outrage', 'fury', 'slams']):
-        score += 8
-
-    # Villains (+6)
-    if any(word in text for word in ['ceo', 'company', 'corporation', 'boss', 'executive']):
-        score += 6
-
-    # Money amounts (+10)
-    if any(word in text for word in ['£', '$', 'cost', 'price', 'expensive', 'cheap']):
-        score += 10
-
-    # Conflict (+7)
-    if any(word in text for word in ['vs', 'versus', 'battle', 'fight', 'war', 'clash']):
-        score += 7
-
-    # Viral people bonus (+12)
-    viral_people_keywords = [
-        'elon musk', 'bezos', 'zuckerberg', 'prince harry', 'meghan',
-        'mrbeast', 'andrew tate', 'kardashian', 'trump', 'biden'
-    ]
-    if any(person in text for person in viral_people_keywords):
-        score += 12
+    score = sum(points for name, points, _ in VIRAL_SIGNALS if name in signals)
 
     # Check if it's a boring topic (penalty)
-    boring_keywords = [
-        'earnings', 'quarterly', 'analyst', 'forecast', 'outlook',
-        'rating', 'upgrade', 'downgrade', 'consensus', 'eps'
-    ]
-    if any(keyword in text for keyword in boring_keywords):
-        score -= 20  # Heavy penalty
+    if 'boring' in signals:
+        score -= BORING_PENALTY
 
     return min(max(score, 0), 100)  # Clamp between 0-100
 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark news_collector.fetch_news against recorded feeds, offline
+
+Feeds are served by a local ReplayServer (src/feed_replay.py) with a
+configurable latency, jitter and error rate, and each run writes to a
+throwaway database. Reports feeds/sec, entries/sec (every feed entry
+handled: stored, duplicate or skipped after early stop), new inserts and
+p50/p99 per-feed latency.
+
+Record real feeds once on a machine with network access:
+    python src/news_collector.py --record data/recordings
+
+Then benchmark anywhere:
+    python scripts/benchmark_collector.py --recordings data/recordings --latency 0.3 --jitter 0.2
+    python scripts/benchmark_collector.py --synthetic --runs 5 --sequential
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from feed_replay import ReplayServer, generate_synthetic_recordings
+from news_collector import fetch_news
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def feed_latencies(db_path):
+    """Per-feed mean fetch latency from the feed health ledger"""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute('SELECT total_latency / fetch_count FROM feed_state WHERE fetch_count > 0')
+    latencies = [row[0] for row in c.fetchall()]
+    c.execute('SELECT COUNT(*) FROM feed_state WHERE failure_count > 0')
+    failed = c.fetchone()[0]
+    conn.close()
+    return latencies, failed
+
+
+def run_once(jobs, db_path, concurrent, verbose):
+    """One fetch_news run; returns (seconds, entries processed, new entries)"""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    stats = {}
+    started = time.perf_counter()
+    with output:
+        fetch_news(concurrent=concurrent, jobs=jobs, db_path=db_path, stats=stats)
+    return time.perf_counter() - started, stats['processed'], stats['inserted']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline collector throughput benchmark')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--recordings', metavar='DIR', help='Recording made with news_collector.py --record')
+    source.add_argument('--synthetic', action='store_true', help='Generate a synthetic recording')
+    parser.add_argument('--latency', type=float, default=0.2, help='Mean response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Latency jitter (+/- seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--runs', type=int, default=3, help='Number of runs')
+    parser.add_argument('--sequential', action='store_true', help='Benchmark the sequential collector')
+    parser.add_argument('--warm', action='store_true',
+                        help='Reuse one database across runs, so later runs exercise conditional GETs')
+    parser.add_argument('--verbose', action='store_true', help='Show collector output')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        record_dir = args.recordings or generate_synthetic_recordings(os.path.join(workdir, 'recordings'))
+        server = ReplayServer(record_dir, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, seed=42).start()
+        jobs = server.feed_jobs()
+
+        mode = 'sequential' if args.sequential else 'concurrent'
+        print(f"\n⏱️  Benchmarking {mode} fetch_news: {len(jobs)} feeds, "
+              f"{args.latency:.2f}s ± {args.jitter:.2f}s latency, {args.error_rate:.0%} errors, "
+              f"{args.runs} {'warm' if args.warm else 'cold'} runs\n")
+        print(f"   {'Run':>3} {'Seconds':>8} {'Feeds/s':>8} {'Entries/s':>10} {'New':>7} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'Failed':>6}")
+
+        totals = []
+        try:
+            for run in range(1, args.runs + 1):
+                db_path = os.path.join(workdir, 'warm.db' if args.warm else f'run{run}.db')
+                if args.warm and os.path.exists(db_path):
+                    # Only the ledger of this run counts towards its latencies
+                    conn = sqlite3.connect(db_path)
+                    conn.execute('UPDATE feed_state SET fetch_count = 0, failure_count = 0, total_latency = 0')
+                    conn.commit()
+                    conn.close()
+
+                seconds, entries, inserted = run_once(jobs, db_path, not args.sequential, args.verbose)
+                latencies, failed = feed_latencies(db_path)
+                p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+                totals.append((seconds, entries, latencies, inserted))
+                print(f"   {run:>3} {seconds:>8.2f} {len(jobs) / seconds:>8.1f} {entries / seconds:>10.0f} "
+                      f"{inserted:>7} {p50 * 1000:>8.0f} {p99 * 1000:>8.0f} {failed:>6}")
+        finally:
+            server.stop()
+
+    seconds = sum(t[0] for t in totals)
+    entries = sum(t[1] for t in totals)
+    inserted = sum(t[3] for t in totals)
+    latencies = [latency for t in totals for latency in t[2]]
+    print(f"\n   All runs: {len(jobs) * len(totals) / seconds:.1f} feeds/s, {entries / seconds:.0f} entries/s, "
+          f"{inserted} new, p50 {percentile(latencies, 50) * 1000:.0f} ms, p99 {percentile(latencies, 99) * 1000:.0f} ms per feed")
+
+
+if __name__ == "__main__":
+    main()
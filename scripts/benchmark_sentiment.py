@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare the lexicon sentiment backend with TextBlob on stored articles
+
+Scores the same articles with both backends and reports throughput,
+label agreement, polarity correlation and a label confusion table, to
+decide whether SENTIMENT_BACKEND = 'lexicon' (config/analysis.py) is good
+enough for our corpus.
+
+    python scripts/benchmark_sentiment.py --limit 5000
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from lexicon_sentiment import LexiconSentiment
+from news_analyzer import sentiment_label
+
+LABELS = ('negative', 'neutral', 'positive')
+
+
+def load_corpus(db_path, limit):
+    """Most recent stored (headline, summary) texts"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT headline, summary
+        FROM articles
+        ORDER BY fetched_ts DESC
+        LIMIT ?
+    ''', (limit,)).fetchall()
+    conn.close()
+    return [f"{headline} {summary}" for headline, summary in rows]
+
+
+def main():
+    default_db = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
+    parser = argparse.ArgumentParser(description='Lexicon vs TextBlob sentiment benchmark')
+    parser.add_argument('--db', default=default_db, help='Database to read articles from')
+    parser.add_argument('--limit', type=int, default=5000, help='Number of recent articles to score')
+    args = parser.parse_args()
+
+    texts = load_corpus(args.db, args.limit)
+    if not texts:
+        print(f"No articles in {args.db}")
+        return
+
+    print(f"\n⏱️  Scoring {len(texts)} stored articles with both sentiment backends...\n")
+
+    started = time.perf_counter()
+    from textblob import TextBlob
+    TextBlob('warm up').sentiment
+    textblob_load = time.perf_counter() - started
+    started = time.perf_counter()
+    reference = np.array([TextBlob(text).sentiment.polarity for text in texts])
+    textblob_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lexicon = LexiconSentiment()
+    lexicon_load = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = lexicon.polarities(texts)
+    lexicon_seconds = time.perf_counter() - started
+
+    print(f"   {'Backend':<10} {'Load s':>7} {'Score s':>8} {'Articles/s':>11}")
+    print(f"   {'textblob':<10} {textblob_load:>7.2f} {textblob_seconds:>8.2f} {len(texts) / textblob_seconds:>11.0f}")
+    print(f"   {'lexicon':<10} {lexicon_load:>7.2f} {lexicon_seconds:>8.2f} {len(texts) / lexicon_seconds:>11.0f}")
+    print(f"   Speed-up: {textblob_seconds / lexicon_seconds:.0f}x")
+
+    expected = [sentiment_label(p) for p in reference]
+    got = [sentiment_label(p) for p in scores]
+    agreement = sum(a == b for a, b in zip(expected, got)) / len(texts)
+    exact = np.mean(np.isclose(reference, scores, atol=1e-6))
+    correlation = np.corrcoef(reference, scores)[0, 1] if reference.std() and scores.std() else float('nan')
+
+    print(f"\n   Label agreement:   {agreement * 100:.1f}%")
+    print(f"   Identical scores:  {exact * 100:.1f}%")
+    print(f"   Pearson r:         {correlation:.3f}")
+    print(f"   Mean |difference|: {np.mean(np.abs(reference - scores)):.3f}")
+
+    corner = 'TextBlob / lexicon'
+    print(f"\n   {corner:<20}" + ''.join(f"{label:>10}" for label in LABELS))
+    for label in LABELS:
+        counts = [sum(1 for a, b in zip(expected, got) if a == label and b == other) for other in LABELS]
+        print(f"   {label:<20}" + ''.join(f"{count:>10}" for count in counts))
+
+
+if __name__ == "__main__":
+    main()
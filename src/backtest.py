@@ -0,0 +1,395 @@
+# backtest.py
+"""
+Historical backtest of story detection over the archive
+
+Answers "which stories would we have posted each day last quarter?".
+Running the detectors with DetectorContext(now=day) for every day would
+re-read up to two weeks of articles per day, country and detector. The
+backtest reads the whole range once instead, as per-day rows, and slides
+every detector window forward one day at a time: the rows of the day
+entering a window are added to its running totals and those of the day
+leaving it are subtracted. BacktestContext serves these totals through the
+DetectorContext interface, so the registered detectors run unchanged.
+
+Results go to the backtest_stories table (and optionally a Parquet file):
+one row per day, country and detector, ranked the way viral_engine picks
+the day's charts. Articles carry their current analysis, so a backtest
+shows what today's taxonomy and detectors would have posted.
+
+    python src/backtest.py --start 2026-07-01 --end 2026-09-30
+"""
+
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.countries import get_active_countries
+from story_detector import (
+    DETECTORS, MIN_POST_SCORE, MIN_RECORD_SCORE, MIN_STORY_SCORE, DetectorContext, StoryDetector
+)
+
+POSTS_PER_DAY = 4               # Charts generated per country and day (see viral_engine.py)
+
+# Detector windows as (first, last) day offsets from the backtested day,
+# matching DetectorContext.window_starts() and the detectors' lookbacks
+THIS_WEEK = (-7, 0)
+LAST_WEEK = (-14, -7)
+RECORD_DAYS = (-2, 0)
+
+
+class SlidingWindow:
+    """
+    Running totals of keyed per-day rows over days [day + first, day + last]
+
+    With distinct=True the keys are (group, item) pairs and `groups` counts
+    the distinct items per group, like COUNT(DISTINCT item) ... GROUP BY group.
+    """
+
+    def __init__(self, rows_by_day, first, last, distinct=False):
+        self.rows_by_day = rows_by_day  # Day number -> [(key, weight)]
+        self.first = first
+        self.last = last
+        self.distinct = distinct
+        self.totals = Counter()
+        self.groups = Counter()
+        self.day = None
+
+    def move_to(self, day):
+        """Slide the window to `day`, touching only the days entering and leaving it"""
+        if self.day is not None and 0 <= day - self.day <= self.last - self.first:
+            leaving = range(self.day + self.first, day + self.first)
+            entering = range(self.day + self.last + 1, day + self.last + 1)
+        else:
+            self.totals.clear()
+            self.groups.clear()
+            leaving = ()
+            entering = range(day + self.first, day + self.last + 1)
+
+        for past_day in leaving:
+            for key, weight in self.rows_by_day.get(past_day, ()):
+                self._add(key, -weight)
+        for new_day in entering:
+            for key, weight in self.rows_by_day.get(new_day, ()):
+                self._add(key, weight)
+        self.day = day
+
+    def _add(self, key, weight):
+        before = self.totals[key]
+        total = before + weight
+        if self.distinct:
+            if not before and total:
+                self.groups[key[0]] += 1
+            elif before and not total:
+                self.groups[key[0]] -= 1
+                if not self.groups[key[0]]:
+                    del self.groups[key[0]]
+        if total:
+            self.totals[key] = total
+        else:
+            self.totals.pop(key, None)
+
+
+def _sort_key(value):
+    # SQL and pandas put missing topics/sources at opposite ends; None sorts first here
+    return (value is not None, value)
+
+
+class BacktestContext(DetectorContext):
+    """
+    DetectorContext for a range of past days, swept forward with set_day()
+
+    The range's per-day aggregates are read once in __init__; each detector
+    window is a SlidingWindow per country (and one for all countries).
+    """
+
+    def __init__(self, first_day, last_day, db_path=None):
+        """
+        Args:
+            first_day: First backtested day, as a day number (POSIX seconds // 86400)
+            last_day: Last backtested day (inclusive)
+            db_path: Path to database
+        """
+        super().__init__(db_path, now=first_day * 86400)
+        self.first_day = first_day
+        self.last_day = last_day
+        self._rows = {}         # (kind, country) -> {day: [(key, weight)]}
+        self._windows = {}      # (kind, first, last, country) -> SlidingWindow
+        self._load()
+        self.set_day(first_day)
+
+    def set_day(self, day):
+        """Make the detectors see the archive as a run at the end of `day` would have"""
+        self.day = day
+        self.now = day * 86400 + 86399
+        self.until = (day + 1) * 86400
+
+    def _append(self, kind, country, day, key, weight=1):
+        """Add a row for its country and for the all-country total"""
+        for scope in (country, None):
+            self._rows.setdefault((kind, scope), defaultdict(list))[day].append((key, weight))
+
+    def _load(self):
+        """Read the per-day rows of every detector window over the whole range"""
+        since = (self.first_day + LAST_WEEK[0]) * 86400
+        until = (self.last_day + 1) * 86400
+
+        rows = self.conn.execute('''
+            SELECT
+                country,
+                fetched_ts / 86400 as day,
+                topic,
+                COALESCE(cluster_id, id) as story,
+                MAX(viral_score >= ?) as viral
+            FROM articles
+            WHERE fetched_ts >= ? AND fetched_ts < ?
+            GROUP BY country, day, topic, story
+        ''', (MIN_STORY_SCORE, since, until))
+        for country, day, topic, story, viral in rows:
+            self._append('stories', country, day, (topic, story))
+            if viral == 1:
+                self._append('viral_stories', country, day, (topic, story))
+
+        rows = self.conn.execute('''
+            SELECT country, day / 86400, topic, SUM(sentiment_sum), SUM(article_count)
+            FROM article_rollups
+            WHERE day >= ? AND day < ?
+            GROUP BY country, day, topic
+        ''', (since, until))
+        for country, day, topic, sentiment_sum, count in rows:
+            self._append('sentiment_sum', country, day, topic, sentiment_sum)
+            self._append('sentiment_count', country, day, topic, count)
+
+        rows = self.conn.execute('''
+            SELECT country, fetched_ts / 86400 as day, source, topic, COUNT(*)
+            FROM articles
+            WHERE fetched_ts >= ? AND fetched_ts < ?
+            AND viral_score >= ?
+            GROUP BY country, day, source, topic
+        ''', ((self.first_day + THIS_WEEK[0]) * 86400, until, MIN_STORY_SCORE))
+        for country, day, source, topic, count in rows:
+            self._append('outlets', country, day, (source, topic), count)
+
+        self._records = defaultdict(list)
+        rows = self.conn.execute('''
+            SELECT
+                country,
+                fetched_ts / 86400,
+                headline,
+                summary,
+                source,
+                viral_score,
+                (SELECT text FROM claims AS n
+                 WHERE n.article_id = articles.id AND n.kind = 'number' AND n.in_headline
+                 ORDER BY n.span_start LIMIT 1) as big_number
+            FROM articles
+            WHERE fetched_ts >= ? AND fetched_ts < ?
+            AND viral_score >= ?
+            AND EXISTS (
+                SELECT 1 FROM claims AS c
+                WHERE c.article_id = articles.id AND c.kind IN ('count', 'percent', 'record')
+            )
+            ORDER BY fetched_ts, id
+        ''', ((self.first_day + RECORD_DAYS[0]) * 86400, until, MIN_RECORD_SCORE))
+        for country, day, *record in rows:
+            self._records[(country, day)].append(tuple(record))
+            self._records[(None, day)].append(tuple(record))
+
+    def _window(self, kind, span, country, distinct=False):
+        """The SlidingWindow of `kind` rows over `span`, moved to the current day"""
+        key = (kind, span, country)
+        if key not in self._windows:
+            self._windows[key] = SlidingWindow(self._rows.get((kind, country), {}), *span, distinct=distinct)
+        window = self._windows[key]
+        window.move_to(self.day)
+        return window
+
+    def topic_story_counts(self, country=None):
+        def count(window):
+            topics = sorted(window.groups, key=lambda topic: (topic is None, topic))   # groupby order, NaN last
+            return pd.DataFrame({'topic': topics, 'count': [window.groups[topic] for topic in topics]})
+
+        return (count(self._window('viral_stories', THIS_WEEK, country, distinct=True)),
+                count(self._window('stories', LAST_WEEK, country, distinct=True)))
+
+    def topic_sentiment(self, country=None):
+        def average(span):
+            sums = self._window('sentiment_sum', span, country)
+            counts = self._window('sentiment_count', span, country)
+            topics = sorted(counts.totals)
+            return pd.DataFrame({
+                'topic': topics,
+                'avg_sentiment': [sums.totals[topic] / counts.totals[topic] for topic in topics]
+            })
+
+        return average(THIS_WEEK), average(LAST_WEEK)
+
+    def people_story_counts(self, country, aliases):
+        # Each detector's aliases are fixed, so their postings are read once per country
+        kind = ('people', tuple(aliases))
+        if (kind, country) not in self._rows:
+            names = defaultdict(list)
+            for term, name in aliases:
+                names[term].append(name)
+            country_filter, params = ("AND country = ?", [country]) if country else ("", [])
+            terms = ', '.join('?' * len(names))
+            rows = self.conn.execute(f'''
+                SELECT t.fetched_ts / 86400 as day, t.term, COALESCE(cluster_id, id) as story
+                FROM article_terms AS t
+                CROSS JOIN articles ON articles.id = t.article_id
+                WHERE t.term IN ({terms})
+                AND t.fetched_ts >= ? AND t.fetched_ts < ?
+                AND viral_score >= ?
+                {country_filter}
+                GROUP BY day, t.term, story
+            ''', list(names) + [(self.first_day + THIS_WEEK[0]) * 86400, (self.last_day + 1) * 86400,
+                                MIN_STORY_SCORE] + params)
+            rows_by_day = defaultdict(list)
+            for day, term, story in rows:
+                rows_by_day[day].extend(((name, story), 1) for name in names[term])
+            self._rows[(kind, country)] = rows_by_day
+        return dict(self._window(kind, THIS_WEEK, country, distinct=True).groups)
+
+    def record_articles(self, country):
+        first, last = RECORD_DAYS
+        return [record for day in range(self.day + first, self.day + last + 1)
+                for record in self._records.get((country, day), ())]
+
+    def outlet_topic_counts(self, country):
+        totals = self._window('outlets', THIS_WEEK, country).totals
+        keys = sorted(totals, key=lambda key: (_sort_key(key[0]), _sort_key(key[1])))
+        return pd.DataFrame({
+            'source': [source for source, _ in keys],
+            'topic': [topic for _, topic in keys],
+            'count': [totals[key] for key in keys]
+        })
+
+
+def init_backtest_table(conn):
+    """Create the backtest_stories table if it does not exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS backtest_stories (
+            day TEXT NOT NULL,
+            country TEXT NOT NULL,
+            detector TEXT NOT NULL,
+            story_type TEXT,
+            headline TEXT,
+            virality_score REAL,
+            rank INTEGER,
+            posted INTEGER,
+            data TEXT,
+            PRIMARY KEY (day, country, detector)
+        )
+    ''')
+
+
+def _data_json(data):
+    """A story's data as JSON text"""
+    if data is None:
+        return None
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.to_json(orient='records' if isinstance(data, pd.DataFrame) else 'index')
+    return json.dumps(data, default=str)
+
+
+def _day_number(date_str):
+    return int(datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()) // 86400
+
+
+def run_backtest(start, end, countries=None, db_path=None, parquet_path=None):
+    """
+    Run every registered detector for every day from start to end
+
+    Args:
+        start: First day, 'YYYY-MM-DD' (UTC)
+        end: Last day, 'YYYY-MM-DD' (inclusive)
+        countries: Country codes to backtest besides global (default: active countries)
+        db_path: Path to database
+        parquet_path: Optional Parquet file to also write the results to (needs pyarrow)
+
+    Returns:
+        DataFrame: One row per day, country ('' for global) and detector; rank
+                   orders the day's postable stories, posted marks the charted ones
+    """
+    first_day, last_day = _day_number(start), _day_number(end)
+    if last_day < first_day:
+        raise ValueError(f"Backtest ends ({end}) before it starts ({start})")
+    if countries is None:
+        countries = get_active_countries()
+
+    started = time.perf_counter()
+    context = BacktestContext(first_day, last_day, db_path)
+    loaded = time.perf_counter() - started
+    detectors = [StoryDetector(country, context=context) for country in list(countries) + [None]]
+
+    print(f"🔁 Backtesting {last_day - first_day + 1} days × {len(detectors)} scopes × "
+          f"{len(DETECTORS)} detectors ({start} to {end})")
+
+    rows = []
+    for day in range(first_day, last_day + 1):
+        context.set_day(day)
+        day_str = (datetime(1970, 1, 1) + timedelta(days=day)).strftime('%Y-%m-%d')
+        for detector in detectors:
+            stories = [(spec.name, getattr(detector, spec.name)()) for spec in DETECTORS]
+
+            # Same selection as find_viral_angles + create_charts_for_country
+            postable = [story for _, story in stories if story.get('virality_score', 0) >= MIN_POST_SCORE]
+            postable.sort(key=lambda story: story.get('virality_score', 0), reverse=True)
+            ranks = {id(story): rank for rank, story in enumerate(postable, 1)}
+
+            for name, story in stories:
+                rank = ranks.get(id(story))
+                rows.append((
+                    day_str,
+                    detector.country or '',
+                    name,
+                    story.get('type'),
+                    story.get('headline'),
+                    float(story.get('virality_score', 0)),
+                    rank,
+                    int(rank is not None and rank <= POSTS_PER_DAY),
+                    _data_json(story.get('data'))
+                ))
+
+    columns = ['day', 'country', 'detector', 'story_type', 'headline', 'virality_score', 'rank', 'posted', 'data']
+    init_backtest_table(context.conn)
+    context.conn.executemany(f'''
+        INSERT OR REPLACE INTO backtest_stories ({', '.join(columns)})
+        VALUES ({', '.join('?' * len(columns))})
+    ''', rows)
+    context.conn.commit()
+    context.conn.close()
+
+    results = pd.DataFrame(rows, columns=columns)
+    if parquet_path:
+        results.to_parquet(parquet_path, index=False)
+
+    elapsed = time.perf_counter() - started
+    posted = int(results['posted'].sum())
+    print(f"✓ {len(results)} detector results, {posted} posted stories in {elapsed:.1f}s "
+          f"({loaded:.1f}s reading the archive)")
+    print(f"   Saved to backtest_stories" + (f" and {parquet_path}" if parquet_path else ""))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay story detection over past days')
+    parser.add_argument('--start', help='First day, YYYY-MM-DD (default: --days before --end)')
+    parser.add_argument('--end', help='Last day, YYYY-MM-DD (default: yesterday)')
+    parser.add_argument('--days', type=int, default=90, help='Days to backtest when --start is omitted')
+    parser.add_argument('--country', action='append', help='Country to backtest (repeatable; default: active countries)')
+    parser.add_argument('--parquet', metavar='PATH', help='Also write the results to a Parquet file')
+    args = parser.parse_args()
+
+    end = args.end or (datetime.now(timezone.utc) - timedelta(days=1)).strftime('%Y-%m-%d')
+    start = args.start or (datetime.strptime(end, '%Y-%m-%d') - timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    run_backtest(start, end, countries=args.country, parquet_path=args.parquet)
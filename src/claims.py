@@ -0,0 +1,157 @@
+# claims.py
+"""
+Numeric claims extracted from articles at ingest
+
+Record detection used to re-run its regexes over the last days' articles on
+every call, and chart generation ran another regex to dig the number out of
+a headline. The collector now extracts every claim once, as articles are
+stored, into the claims table:
+
+    number    every number in the text, scaled by a following
+              thousand/million/billion/trillion (the magnitude)
+    count     "<number> [million|...] people|deaths|jobs|homes"
+    percent   "<n>% increase|decrease|rise|fall"
+    record    "highest in/since", "lowest in/since", "record high/low"
+
+Spans are character offsets into f"{headline} {summary}". The index on
+(country, fetched_ts, magnitude) serves record lookups and "biggest number
+this week" queries without touching article text.
+"""
+
+import re
+
+BACKFILL_CHUNK_SIZE = 2000      # Articles scanned per batch when the table is first built
+
+NUMBER_PATTERN = re.compile(
+    r'([£$€])?(\d+(?:,\d{3})*(?:\.\d+)?)(%|\s*(?:thousand|million|billion|trillion)\b)?',
+    re.IGNORECASE
+)
+COUNT_PATTERN = re.compile(
+    r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(million|billion|thousand)?\s*(people|deaths|jobs|homes)',
+    re.IGNORECASE
+)
+PERCENT_PATTERN = re.compile(r'(\d+)%\s+(increase|decrease|rise|fall)', re.IGNORECASE)
+RECORD_PATTERN = re.compile(r'(highest|lowest)\s+(?:in|since)|record\s+(high|low)', re.IGNORECASE)
+
+MULTIPLIERS = {'thousand': 1e3, 'million': 1e6, 'billion': 1e9, 'trillion': 1e12}
+
+
+def _number(text):
+    return float(text.replace(',', ''))
+
+
+def extract_claims(headline, summary):
+    """
+    Numeric claims in an article's headline + summary
+
+    Returns:
+        list: (kind, value, unit, magnitude, direction, span_start, span_end,
+               text, in_headline) tuples
+    """
+    headline = headline or ''
+    text = f"{headline} {summary or ''}"
+    headline_end = len(headline)
+    claims = []
+
+    def add(kind, value, unit, magnitude, direction, match, group=0):
+        start, end = match.span(group)
+        claims.append((kind, value, unit, magnitude, direction, start, end,
+                       match.group(group), int(end <= headline_end)))
+
+    for match in NUMBER_PATTERN.finditer(text):
+        currency, digits, suffix = match.groups()
+        value = _number(digits)
+        suffix = (suffix or '').strip().lower()
+        unit = currency or ('%' if suffix == '%' else None)
+        add('number', value, unit, value * MULTIPLIERS.get(suffix, 1), None, match, 2)
+
+    for match in COUNT_PATTERN.finditer(text):
+        value = _number(match.group(1))
+        multiplier = MULTIPLIERS.get((match.group(2) or '').lower(), 1)
+        add('count', value, match.group(3).lower(), value * multiplier, None, match)
+
+    for match in PERCENT_PATTERN.finditer(text):
+        value = _number(match.group(1))
+        add('percent', value, '%', value, match.group(2).lower(), match)
+
+    for match in RECORD_PATTERN.finditer(text):
+        direction = match.group(1) or f"record {match.group(2)}"
+        add('record', None, None, None, direction.lower(), match)
+
+    return claims
+
+
+def init_claims(conn):
+    """
+    Create the claims table, extracting claims of stored articles when it is new
+
+    Returns:
+        bool: True if the table was created (and filled) by this call
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'claims'"
+    ).fetchone()
+    if exists:
+        return False
+
+    conn.execute('''
+        CREATE TABLE claims (
+            article_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            span_start INTEGER NOT NULL,
+            span_end INTEGER,
+            country TEXT,
+            fetched_ts INTEGER,
+            value REAL,
+            unit TEXT,
+            magnitude REAL,
+            direction TEXT,
+            text TEXT,
+            in_headline INTEGER,
+            PRIMARY KEY (article_id, kind, span_start)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_claims_country_fetched ON claims(country, fetched_ts, magnitude)')
+
+    scanned = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute('''
+            SELECT rowid, id, headline, summary, country, fetched_ts
+            FROM articles
+            WHERE rowid > ?
+            ORDER BY rowid
+            LIMIT ?
+        ''', (last_rowid, BACKFILL_CHUNK_SIZE)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        store_claims(conn, [row[1:] for row in rows])
+        scanned += len(rows)
+
+    conn.commit()
+    if scanned:
+        print(f"  Extracted numeric claims of {scanned} stored articles")
+    return True
+
+
+def store_claims(conn, articles):
+    """
+    Extract and insert the claims of articles (not committed here)
+
+    Claims already stored for an article are kept, so re-offered rows are harmless.
+
+    Args:
+        conn: Open SQLite connection
+        articles: (id, headline, summary, country, fetched_ts) tuples
+    """
+    conn.executemany('''
+        INSERT OR IGNORE INTO claims
+        (article_id, country, fetched_ts, kind, value, unit, magnitude, direction,
+         span_start, span_end, text, in_headline)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        (article_id, country, fetched_ts, *claim)
+        for article_id, headline, summary, country, fetched_ts in articles
+        for claim in extract_claims(headline, summary)
+    ))
@@ -0,0 +1,38 @@
+# db_utils.py
+"""
+Small SQLite helpers shared by the collector, analyzer and detector
+
+Schema migrations add columns in place with add_column(), and day windows
+are bounded with day_start_ts() so they hit the fetched_ts indexes. Kept in
+a module of their own so no pipeline stage imports another just for them.
+"""
+
+import sqlite3
+import time
+
+
+def add_column(conn, table, column, definition):
+    """
+    Add a column to an existing table, ignoring it if already present
+
+    Returns:
+        bool: True if the column was added by this call
+    """
+    try:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+    except sqlite3.OperationalError as e:
+        if "duplicate column" not in str(e).lower():
+            raise
+        return False
+
+
+def day_start_ts(days_ago, now=None):
+    """
+    POSIX timestamp of UTC midnight `days_ago` days before today (or before `now`)
+
+    Equivalent to DATE('now', '-N days') but usable as a range bound on the
+    indexed fetched_ts column.
+    """
+    now = time.time() if now is None else now
+    return int(now // 86400 - days_ago) * 86400
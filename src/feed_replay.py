@@ -0,0 +1,198 @@
+# feed_replay.py
+"""
+Record and replay raw RSS feed bodies for offline collector runs
+
+Recording: fetch_news(record_dir=...) saves every downloaded feed body to
+`record_dir` and writes an index.json mapping each feed URL to its file,
+country and source.
+
+Replay: ReplayServer serves a recording directory over local HTTP with a
+configurable latency, jitter and error rate, so collector changes can be
+measured on a machine with no network (see scripts/benchmark_collector.py).
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+INDEX_FILE = 'index.json'
+
+
+def recording_name(url):
+    """File name a feed URL is recorded under"""
+    return hashlib.sha1(url.encode()).hexdigest() + '.xml'
+
+
+def save_recording(record_dir, url, content):
+    """Save one raw feed body (safe to call from fetch threads)"""
+    os.makedirs(record_dir, exist_ok=True)
+    with open(os.path.join(record_dir, recording_name(url)), 'wb') as f:
+        f.write(content)
+
+
+def write_recording_index(record_dir, jobs):
+    """
+    Write index.json for the feeds that were recorded
+
+    Args:
+        record_dir: Recording directory
+        jobs: List of (country, source, url) that were polled
+    """
+    os.makedirs(record_dir, exist_ok=True)
+    index_path = os.path.join(record_dir, INDEX_FILE)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    for country, source, url in jobs:
+        name = recording_name(url)
+        if os.path.exists(os.path.join(record_dir, name)):
+            index[url] = {'file': name, 'country': country, 'source': source}
+
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"📼 Recorded {len(index)} feeds to {record_dir}/")
+
+
+def load_recording_index(record_dir):
+    """Load index.json of a recording directory"""
+    with open(os.path.join(record_dir, INDEX_FILE)) as f:
+        return json.load(f)
+
+
+def generate_synthetic_recordings(record_dir, feeds_per_country=11, entries=50,
+                                  countries=('UK', 'US'), seed=7):
+    """
+    Write a synthetic recording for machines that have never recorded real feeds
+
+    Returns:
+        str: record_dir
+    """
+    rng = random.Random(seed)
+    words = ('government minister prices energy bills strike union council hospital school '
+             'record crisis company billion million families police court election climate '
+             'football film music travel food health tech market rent mortgage war talks').split()
+    jobs = []
+    for country in countries:
+        for n in range(feeds_per_country):
+            source = f"{country} Feed {n + 1}"
+            url = f"http://{country.lower()}-outlet-{n % 8 + 1}.synthetic/feed/{n + 1}.xml"
+            items = []
+            for i in range(entries):
+                title = ' '.join(rng.choice(words) for _ in range(9)).capitalize()
+                summary = ' '.join(rng.choice(words) for _ in range(30))
+                published = time.strftime('%a, %d %b %Y %H:%M:%S +0000',
+                                          time.gmtime(time.time() - i * rng.randint(300, 5400)))
+                items.append(
+                    f"<item><title>{title}</title><link>{url}#{i}</link>"
+                    f"<description>{summary}</description><pubDate>{published}</pubDate></item>"
+                )
+            body = ('<?xml version="1.0"?><rss version="2.0"><channel>'
+                    f"<title>{source}</title>{''.join(items)}</channel></rss>")
+            save_recording(record_dir, url, body.encode())
+            jobs.append((country, source, url))
+
+    write_recording_index(record_dir, jobs)
+    return record_dir
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in serving a recording directory
+
+    One listener is opened per original host, each on its own loopback port,
+    so the collector's per-host concurrency caps behave as they do live.
+    """
+
+    def __init__(self, record_dir, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        """
+        Args:
+            record_dir: Directory written by a recording run
+            latency: Mean seconds added before each response
+            jitter: Uniform +/- seconds around the mean latency
+            error_rate: Fraction of requests answered with HTTP 503
+            seed: Random seed for reproducible latency and errors
+        """
+        self.record_dir = record_dir
+        self.index = load_recording_index(record_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.servers = {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.rng_lock:
+                    delay = max(server.latency + server.rng.uniform(-server.jitter, server.jitter), 0)
+                    fail = server.rng.random() < server.error_rate
+                time.sleep(delay)
+
+                path = os.path.join(server.record_dir, os.path.basename(self.path))
+                if fail or not os.path.exists(path):
+                    self.send_response(503 if fail else 404)
+                    self.end_headers()
+                    return
+
+                with open(path, 'rb') as f:
+                    body = f.read()
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving in background threads"""
+        handler = self._handler()
+        for url in self.index:
+            host = urlparse(url).netloc
+            if host in self.servers:
+                continue
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+            httpd.daemon_threads = True
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            self.servers[host] = httpd
+        return self
+
+    def stop(self):
+        """Stop all listeners"""
+        for httpd in self.servers.values():
+            httpd.shutdown()
+            httpd.server_close()
+        self.servers = {}
+
+    def feed_jobs(self):
+        """
+        The recorded feeds, pointed at this server
+
+        Returns:
+            list: (country, source, url) tuples for fetch_news(jobs=...)
+        """
+        jobs = []
+        for url, meta in self.index.items():
+            port = self.servers[urlparse(url).netloc].server_address[1]
+            jobs.append((meta['country'], meta['source'], f"http://127.0.0.1:{port}/{meta['file']}"))
+        return jobs
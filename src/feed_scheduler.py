@@ -0,0 +1,137 @@
+# feed_scheduler.py
+"""
+Adaptive polling schedule for RSS feeds
+
+Each feed's publish rate is learned from the published timestamps already
+stored in the articles table. Busy feeds are polled often and slow ones
+rarely, and feeds that keep failing back off exponentially. The schedule
+lives in the feed_state table (poll_interval / next_poll_at).
+"""
+
+import time
+from datetime import datetime, timedelta
+
+MIN_POLL_INTERVAL = 15 * 60         # Never poll a feed more than every 15 minutes
+MAX_POLL_INTERVAL = 12 * 3600       # Poll even the slowest feed twice a day
+MAX_BACKOFF_INTERVAL = 24 * 3600    # Failing feeds are retried at least daily
+DEFAULT_POLL_INTERVAL = 3600        # Feeds with no history yet
+ITEMS_PER_POLL = 2                  # Aim to find about this many new items per poll
+RATE_WINDOW_DAYS = 14               # History used to learn publish rates
+
+
+def learn_publish_rates(conn, days=RATE_WINDOW_DAYS):
+    """
+    Estimate how often each feed publishes
+
+    Args:
+        conn: Open SQLite connection
+        days: History window in days
+
+    Returns:
+        dict: (country, source) -> items per second
+    """
+    since = int(time.time()) - days * 86400
+    c = conn.cursor()
+    c.execute('''
+        SELECT country, source, COUNT(*), MIN(published_ts), MAX(published_ts)
+        FROM articles
+        WHERE fetched_ts >= ?
+        AND published_ts IS NOT NULL
+        GROUP BY country, source
+    ''', (since,))
+
+    rates = {}
+    for country, source, count, first, last in c.fetchall():
+        if count < 2:
+            continue
+        span = max(last - first, 3600)
+        rates[(country, source)] = (count - 1) / span
+    return rates
+
+
+def poll_interval(rate, failures=0):
+    """
+    Seconds to wait before polling a feed again
+
+    Args:
+        rate: Items per second (None when unknown)
+        failures: Consecutive failed fetches
+
+    Returns:
+        int: Interval in seconds
+    """
+    if rate:
+        interval = ITEMS_PER_POLL / rate
+    else:
+        interval = DEFAULT_POLL_INTERVAL
+    interval = min(max(interval, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+
+    if failures:
+        interval = min(interval * 2 ** min(failures, 10), MAX_BACKOFF_INTERVAL)
+    return int(interval)
+
+
+def filter_due_feeds(conn, feeds, now=None):
+    """
+    Keep the feeds whose next poll time has passed
+
+    Args:
+        conn: Open SQLite connection
+        feeds: List of (country, source, url)
+        now: Reference time (defaults to now)
+
+    Returns:
+        list: The due subset of feeds (never-scheduled feeds are always due)
+    """
+    now = (now or datetime.now()).isoformat()
+    c = conn.cursor()
+    c.execute('SELECT url, next_poll_at FROM feed_state')
+    next_poll = dict(c.fetchall())
+    return [feed for feed in feeds if not next_poll.get(feed[2]) or next_poll[feed[2]] <= now]
+
+
+def update_schedule(conn, feeds, now=None):
+    """
+    Set the next poll time of every feed just polled
+
+    Not committed here; the collector commits with the rest of the run.
+
+    Args:
+        conn: Open SQLite connection
+        feeds: Iterable of (country, source, url) that were polled
+        now: Reference time (defaults to now)
+    """
+    now = now or datetime.now()
+    rates = learn_publish_rates(conn)
+
+    c = conn.cursor()
+    c.execute('SELECT url, consecutive_failures FROM feed_state')
+    failures = dict(c.fetchall())
+
+    updates = []
+    for country, source, url in feeds:
+        interval = poll_interval(rates.get((country, source)), failures.get(url) or 0)
+        updates.append((interval, (now + timedelta(seconds=interval)).isoformat(), url))
+
+    conn.executemany('''
+        UPDATE feed_state SET poll_interval = ?, next_poll_at = ? WHERE url = ?
+    ''', updates)
+
+
+def print_schedule(conn):
+    """Print each feed's learned polling interval"""
+    c = conn.cursor()
+    c.execute('''
+        SELECT country, source, poll_interval, consecutive_failures, next_poll_at
+        FROM feed_state
+        WHERE poll_interval IS NOT NULL
+        ORDER BY poll_interval, country, source
+    ''')
+    rows = c.fetchall()
+    if not rows:
+        return
+
+    print("\n⏰ Polling schedule:")
+    for country, source, interval, failures, next_poll_at in rows:
+        note = f"  ({failures} failures, backing off)" if failures else ""
+        print(f"   {country:<3} {source:<24} every {interval / 60:>5.0f} min, next {next_poll_at[11:16]}{note}")
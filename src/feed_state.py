@@ -0,0 +1,205 @@
+# feed_state.py
+"""
+Persistent per-feed state kept alongside the articles table
+
+Stores the HTTP validators (ETag / Last-Modified) and a hash of the last
+body seen for each feed URL so the collector can send conditional requests
+and skip feeds that have not changed since the previous run. The same row
+carries the feed's polling schedule (see feed_scheduler.py) and its health
+ledger: failures, latency and bytes, which drive a circuit breaker that
+stops the collector from retrying dead feeds on every run.
+"""
+
+from datetime import datetime, timedelta
+
+from db_utils import add_column
+
+CIRCUIT_FAILURE_THRESHOLD = 3       # Consecutive failures before a feed is skipped
+CIRCUIT_COOLDOWN = 6 * 3600         # Seconds a tripped feed is skipped before one probe
+
+
+def init_feed_state(conn):
+    """Create the feed_state table if it does not exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feed_state (
+            url TEXT PRIMARY KEY,
+            source TEXT,
+            country TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            cache_hits INTEGER DEFAULT 0,
+            cache_misses INTEGER DEFAULT 0,
+            updated_at TEXT
+        )
+    ''')
+
+    # Polling schedule
+    add_column(conn, 'feed_state', 'consecutive_failures', 'INTEGER DEFAULT 0')
+    add_column(conn, 'feed_state', 'poll_interval', 'INTEGER')
+    add_column(conn, 'feed_state', 'next_poll_at', 'TEXT')
+
+    # Health ledger
+    add_column(conn, 'feed_state', 'fetch_count', 'INTEGER DEFAULT 0')
+    add_column(conn, 'feed_state', 'failure_count', 'INTEGER DEFAULT 0')
+    add_column(conn, 'feed_state', 'total_latency', 'REAL DEFAULT 0')
+    add_column(conn, 'feed_state', 'total_bytes', 'INTEGER DEFAULT 0')
+    add_column(conn, 'feed_state', 'last_success_at', 'TEXT')
+    add_column(conn, 'feed_state', 'last_failure_at', 'TEXT')
+    add_column(conn, 'feed_state', 'circuit_open_until', 'TEXT')
+    conn.commit()
+
+
+def load_feed_states(conn):
+    """
+    Load the stored state of every feed
+
+    Returns:
+        dict: feed URL -> dict of stored columns
+    """
+    c = conn.cursor()
+    c.execute('''
+        SELECT url, etag, last_modified, content_hash, consecutive_failures, circuit_open_until
+        FROM feed_state
+    ''')
+    return {
+        url: {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash,
+            'consecutive_failures': failures or 0,
+            'circuit_open_until': circuit_open_until
+        }
+        for url, etag, last_modified, content_hash, failures, circuit_open_until in c.fetchall()
+    }
+
+
+def circuit_status(state, now=None):
+    """
+    Circuit breaker position for a feed
+
+    Args:
+        state: Entry from load_feed_states() (or None for an unknown feed)
+        now: Reference time (defaults to now)
+
+    Returns:
+        str: 'closed' (fetch normally), 'open' (skip) or 'half_open' (send one probe)
+    """
+    if not state or not state.get('circuit_open_until'):
+        return 'closed'
+    now = (now or datetime.now()).isoformat()
+    return 'open' if now < state['circuit_open_until'] else 'half_open'
+
+
+def record_feed_fetch(conn, url, source, country, feed, elapsed=0.0):
+    """
+    Store the validators of a successful fetch and count a cache hit or miss
+
+    Not committed here: the caller commits together with the feed's articles
+    so the stored validators never run ahead of the stored entries. A
+    success also closes the feed's circuit breaker.
+
+    Args:
+        conn: Open SQLite connection
+        url: Feed URL
+        source: Source name
+        country: Country code
+        feed: Result of fetch_feed_with_retry (status 304 means cache hit)
+        elapsed: Seconds spent fetching, retries included
+    """
+    hit = 1 if feed.get('status') == 304 else 0
+    now = datetime.now().isoformat()
+    conn.execute('''
+        INSERT INTO feed_state
+        (url, source, country, etag, last_modified, content_hash, cache_hits, cache_misses, updated_at,
+         fetch_count, total_latency, total_bytes, last_success_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            source = excluded.source,
+            country = excluded.country,
+            etag = COALESCE(excluded.etag, feed_state.etag),
+            last_modified = COALESCE(excluded.last_modified, feed_state.last_modified),
+            content_hash = COALESCE(excluded.content_hash, feed_state.content_hash),
+            cache_hits = feed_state.cache_hits + excluded.cache_hits,
+            cache_misses = feed_state.cache_misses + excluded.cache_misses,
+            consecutive_failures = 0,
+            circuit_open_until = NULL,
+            fetch_count = feed_state.fetch_count + 1,
+            total_latency = feed_state.total_latency + excluded.total_latency,
+            total_bytes = feed_state.total_bytes + excluded.total_bytes,
+            last_success_at = excluded.last_success_at,
+            updated_at = excluded.updated_at
+    ''', (
+        url,
+        source,
+        country,
+        feed.get('etag'),
+        feed.get('modified'),
+        feed.get('content_hash'),
+        hit,
+        1 - hit,
+        now,
+        elapsed,
+        feed.get('bytes', 0),
+        now
+    ))
+
+
+def record_feed_failure(conn, url, source, country, elapsed=0.0):
+    """
+    Count a failed fetch (not committed here, see record_feed_fetch)
+
+    Once a feed reaches CIRCUIT_FAILURE_THRESHOLD consecutive failures its
+    circuit opens for CIRCUIT_COOLDOWN seconds. A failed probe re-opens it.
+    """
+    now = datetime.now()
+    open_until = (now + timedelta(seconds=CIRCUIT_COOLDOWN)).isoformat()
+    conn.execute('''
+        INSERT INTO feed_state
+        (url, source, country, consecutive_failures, updated_at,
+         fetch_count, failure_count, total_latency, last_failure_at)
+        VALUES (?, ?, ?, 1, ?, 1, 1, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            consecutive_failures = feed_state.consecutive_failures + 1,
+            circuit_open_until = CASE
+                WHEN feed_state.consecutive_failures + 1 >= ? THEN ?
+                ELSE feed_state.circuit_open_until
+            END,
+            fetch_count = feed_state.fetch_count + 1,
+            failure_count = feed_state.failure_count + 1,
+            total_latency = feed_state.total_latency + excluded.total_latency,
+            last_failure_at = excluded.last_failure_at,
+            updated_at = excluded.updated_at
+    ''', (url, source, country, now.isoformat(), elapsed, now.isoformat(),
+          CIRCUIT_FAILURE_THRESHOLD, open_until))
+
+
+def print_feed_report(conn):
+    """Print the health ledger, most expensive feeds first"""
+    c = conn.cursor()
+    c.execute('''
+        SELECT country, source, fetch_count, failure_count, consecutive_failures,
+               total_latency, total_bytes, cache_hits, cache_misses,
+               last_success_at, circuit_open_until
+        FROM feed_state
+        ORDER BY total_latency DESC
+    ''')
+    rows = c.fetchall()
+    if not rows:
+        return
+
+    print("\n📋 Feed health (since first run, most time spent first):")
+    print(f"   {'':<3} {'Source':<24} {'Fetches':>7} {'Fails':>5} {'Total s':>8} {'Mean s':>6} "
+          f"{'KB':>8} {'Cache hit':>9}  Last success")
+    for (country, source, fetches, failures, consecutive, latency, total_bytes,
+         hits, misses, last_success, open_until) in rows:
+        mean = latency / fetches if fetches else 0
+        lookups = hits + misses
+        hit_rate = f"{hits / lookups * 100:.0f}%" if lookups else "-"
+        status = (last_success or 'never')[:16].replace('T', ' ')
+        if open_until:
+            status += f"  ⛔ circuit open until {open_until[:16].replace('T', ' ')}"
+        elif consecutive:
+            status += f"  ({consecutive} failing)"
+        print(f"   {country:<3} {source:<24} {fetches:>7} {failures:>5} {latency:>8.1f} {mean:>6.2f} "
+              f"{total_bytes / 1024:>8.0f} {hit_rate:>9}  {status}")
@@ -0,0 +1,56 @@
+# fingerprints.py
+"""
+Config fingerprints that stamp stored results
+
+Analyzed rows carry analysis_fingerprint() (news_analyzer.py) and memoized
+detector results are keyed on one too (story_detector.py), so editing the
+config invalidates them without anyone bumping a version by hand. Kept
+apart from both modules so either can import it without a cycle.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.countries import COUNTRIES, get_global_topics, get_viral_people
+from config.viral_topics import VIRAL_TOPICS, VIRAL_SIGNALS, BORING_KEYWORDS, BORING_PENALTY
+from config.analysis import SENTIMENT_BACKEND
+
+# Bump when the analysis logic itself changes (config edits are picked up automatically)
+ANALYSIS_VERSION = 1
+
+
+def config_digest(config):
+    """Short hex digest of a JSON-serializable config structure"""
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def analysis_fingerprint():
+    """
+    Fingerprint of everything an article's analysis depends on
+
+    Covers the topic taxonomies (global, per-country local and viral), the
+    tracked people (their keywords are stored as terms), the viral signals
+    and penalty, the sentiment backend and ANALYSIS_VERSION.
+    Each analyzed row is stamped with it, so after a config edit the rows
+    scored under the old rules can be found and re-scored.
+
+    Returns:
+        str: Short hex digest
+    """
+    return config_digest({
+        'version': ANALYSIS_VERSION,
+        'global_topics': get_global_topics(),
+        'local_topics': {country: settings.get('local_topics', {}) for country, settings in COUNTRIES.items()},
+        'politicians': {country: settings.get('politicians', {}) for country, settings in COUNTRIES.items()},
+        'viral_people': get_viral_people(),
+        'viral_topics': VIRAL_TOPICS,
+        'viral_signals': VIRAL_SIGNALS,
+        'boring_keywords': BORING_KEYWORDS,
+        'boring_penalty': BORING_PENALTY,
+        'sentiment_backend': SENTIMENT_BACKEND,
+    })
@@ -129,10 +129,8 @@ class JSONChartGenerator:
         if not record:
             return None
 
-        # Extract number from headline
-        import re
-        numbers = re.findall(r'\d+(?:,\d{3})*(?:\.\d+)?', str(record.get('headline', '')))
-        big_number = numbers[0] if numbers else "NEW"
+        # First number of the headline, extracted at ingest (see claims.py)
+        big_number = record.get('big_number') or "NEW"
 
         # Primary variant: Giant number display
         primary = {
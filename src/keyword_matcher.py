@@ -0,0 +1,191 @@
+# keyword_matcher.py
+"""
+Shared multi-keyword matcher for article analysis
+
+Topic classification, scope detection, viral scoring and people tracking
+used to test every configured keyword with `keyword in text`, re-scanning
+the article once per keyword. Here all keyword lists are compiled once into
+an Aho-Corasick automaton, and a single pass over the lowercased text
+returns every list that matched.
+
+Matching keeps the old semantics: plain substring matching, and each keyword
+counts once per list it appears in however often it occurs in the text.
+matches() also notes which keywords occur as whole words, for the stored
+term index (see term_index.py).
+
+Tags identify the list a keyword came from:
+    ('global', topic)                     GLOBAL_TOPICS
+    ('local', country, topic)             a country's local_topics
+    ('viral', category, subcategory)      VIRAL_TOPICS
+    ('politician', country, name)         a country's politicians
+    ('person', name)                      VIRAL_PEOPLE
+    ('signal', name)                      VIRAL_SIGNALS / BORING_KEYWORDS
+"""
+
+import os
+import sys
+from collections import Counter, deque
+from functools import lru_cache
+from itertools import chain
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.countries import COUNTRIES, get_global_topics, get_viral_people
+from config.viral_topics import VIRAL_TOPICS, VIRAL_SIGNALS, BORING_KEYWORDS
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton mapping keywords to the tags of their lists"""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+        self.tags = {}          # keyword -> list of tags (one per list it appears in)
+        self.keywords_by_tag = {}
+        self.built = False
+
+    def add(self, keyword, tag):
+        """Register a keyword under a tag (before build())"""
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        self.tags.setdefault(keyword, []).append(tag)
+
+    def build(self):
+        """Compile the trie, failure links and merged outputs"""
+        for keyword in self.tags:
+            state = 0
+            for ch in keyword:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.output[state] = (keyword,)
+            for tag in self.tags[keyword]:
+                self.keywords_by_tag.setdefault(tag, []).append(keyword)
+
+        # Breadth-first so each failure target is finished before it is used.
+        # Failure links are folded into each state's transitions, so scanning
+        # is one dict lookup per character.
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = self.goto[self.fail[state]]
+            self.output[state] = self.output[state] + self.output[self.fail[state]]
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                self.fail[nxt] = fallback.get(ch, 0)
+            for ch, target in fallback.items():
+                self.goto[state].setdefault(ch, target)
+
+        self.built = True
+        return self
+
+    def keywords_in(self, text):
+        """
+        Distinct keywords occurring in a text
+
+        Returns:
+            set: Matched keywords
+        """
+        goto, output = self.goto, self.output
+        found = set()
+        state = 0
+        for ch in text.lower():
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def matches(self, text):
+        """
+        Distinct keywords occurring in a text, noting whole-word occurrences
+
+        Returns:
+            dict: keyword -> True if at least one occurrence is bounded by
+                  non-alphanumeric characters (or the ends of the text)
+        """
+        goto, output = self.goto, self.output
+        lowered = text.lower()
+        end = len(lowered) - 1
+        found = {}
+        state = 0
+        for i, ch in enumerate(lowered):
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for keyword in output[state]:
+                    if not found.get(keyword):
+                        start = i - len(keyword)
+                        found[keyword] = ((start < 0 or not lowered[start].isalnum())
+                                          and (i == end or not lowered[i + 1].isalnum()))
+        return found
+
+    def tags_of(self, keywords):
+        """
+        Tag counts of a set of matched keywords
+
+        Returns:
+            Counter: tag -> number of the keywords in that list
+        """
+        tags = self.tags
+        return Counter(chain.from_iterable(tags[keyword] for keyword in keywords))
+
+    def keywords_of(self, tag):
+        """Keywords registered under a tag"""
+        return list(self.keywords_by_tag.get(tag, ()))
+
+    def scan(self, text):
+        """
+        Match every keyword list against a text in one pass
+
+        Returns:
+            Counter: tag -> number of distinct keywords of that list found
+        """
+        return self.tags_of(self.keywords_in(text))
+
+
+@lru_cache(maxsize=1)
+def get_matcher():
+    """The automaton over every configured keyword list (built on first use)"""
+    automaton = KeywordAutomaton()
+
+    for topic, keywords in get_global_topics().items():
+        for keyword in keywords:
+            automaton.add(keyword, ('global', topic))
+
+    for country, config in COUNTRIES.items():
+        for topic, keywords in config.get('local_topics', {}).items():
+            for keyword in keywords:
+                automaton.add(keyword, ('local', country, topic))
+        for name, keywords in config.get('politicians', {}).items():
+            for keyword in keywords:
+                automaton.add(keyword, ('politician', country, name))
+
+    for category, subcategories in VIRAL_TOPICS.items():
+        for subcategory, keywords in subcategories.items():
+            for keyword in keywords:
+                automaton.add(keyword, ('viral', category, subcategory))
+
+    for category, people in get_viral_people().items():
+        for name, keywords in people.items():
+            for keyword in keywords:
+                automaton.add(keyword, ('person', name))
+
+    for name, _, keywords in VIRAL_SIGNALS:
+        for keyword in keywords:
+            automaton.add(keyword, ('signal', name))
+    for keyword in BORING_KEYWORDS:
+        automaton.add(keyword, ('signal', 'boring'))
+
+    return automaton.build()
+
+
+def scan(text):
+    """Shortcut for get_matcher().scan(text)"""
+    return get_matcher().scan(text)
@@ -0,0 +1,183 @@
+# lexicon_sentiment.py
+"""
+Batch lexicon sentiment scoring with NumPy
+
+A fast alternative to TextBlob, selected with SENTIMENT_BACKEND = 'lexicon'
+in config/analysis.py. It reads the same adjective polarity lexicon TextBlob
+uses (textblob/en/en-sentiment.xml) and reproduces the core of its scoring:
+the polarity of a text is the mean polarity of the lexicon words in it, an
+adverb right before a word scales it by the adverb's intensity, a preceding
+negation flips and halves it, and "!" boosts the word before it.
+
+A whole batch is tokenized once and then scored with array operations, so
+the per-article cost is little more than the tokenizing. Sarcasm markers,
+emoticons and modifiers separated from their word are not modelled; see
+scripts/benchmark_sentiment.py for agreement with TextBlob.
+"""
+
+import importlib.util
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from functools import lru_cache
+
+import numpy as np
+
+NEGATIONS = ('no', 'not', 'never')
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*|'[a-z]+|[^\s\w]")
+EXCLAMATION_BOOST = 1.25
+
+
+def textblob_lexicon_path():
+    """Location of TextBlob's sentiment lexicon, found without importing TextBlob"""
+    spec = importlib.util.find_spec('textblob')
+    if spec is None or not spec.submodule_search_locations:
+        raise ImportError("The lexicon sentiment backend needs the textblob package's lexicon file")
+    return os.path.join(spec.submodule_search_locations[0], 'en', 'en-sentiment.xml')
+
+
+def tokenize(text):
+    """
+    Lowercased tokens split the way TextBlob splits them
+
+    Punctuation marks are tokens of their own and contractions break into
+    short pieces ("isn't" -> "isn", "'t"), so they neither match the lexicon
+    nor interrupt a preceding negation or adverb.
+    """
+    return TOKEN_PATTERN.findall(str(text).lower().replace("n't", " n't"))
+
+
+class LexiconSentiment:
+    """Polarity lexicon compiled into lookup arrays"""
+
+    def __init__(self, path=None):
+        senses = {}
+        for word in ElementTree.parse(path or textblob_lexicon_path()).getroot().findall('word'):
+            form = word.attrib.get('form')
+            if not form:
+                continue
+            psi = (float(word.attrib.get('polarity', 0.0)), float(word.attrib.get('intensity', 1.0)))
+            senses.setdefault(form.lower(), {}).setdefault(word.attrib.get('pos'), []).append(psi)
+
+        # Like TextBlob: average senses per part of speech, then across parts of speech
+        words = {}
+        for form, by_pos in senses.items():
+            per_pos = {pos: tuple(np.mean(psi, axis=0)) for pos, psi in by_pos.items()}
+            words[form] = (tuple(np.mean(list(per_pos.values()), axis=0)), 'RB' in per_pos)
+
+        # Like TextBlob's English loader: adjectives lend their score to an
+        # "-ly" adverb ("terrible" -> "terribly"), overriding the stored one
+        for form, by_pos in senses.items():
+            if 'JJ' in by_pos:
+                stem = form[:-1] + 'i' if form.endswith('y') else form
+                stem = stem[:-2] if stem.endswith('le') else stem
+                words[stem + 'ly'] = (tuple(np.mean(by_pos['JJ'], axis=0)), True)
+
+        # Id 0 is every unknown word; negations and "!" get ids so they can be spotted
+        self.vocab = {}
+        polarity, intensity, known, modifier = [0.0], [1.0], [False], [False]
+        for form, ((p, i), is_adverb) in words.items():
+            self.vocab[form] = len(polarity)
+            polarity.append(p)
+            intensity.append(i)
+            known.append(True)
+            modifier.append(is_adverb)
+        for word in NEGATIONS + ('!',):
+            if word not in self.vocab:
+                self.vocab[word] = len(polarity)
+                polarity.append(0.0)
+                intensity.append(1.0)
+                known.append(False)
+                modifier.append(False)
+
+        self.polarity = np.array(polarity)
+        self.intensity = np.array(intensity)
+        self.known = np.array(known)
+        self.modifier = np.array(modifier)
+        self.negation = np.zeros(len(polarity), dtype=bool)
+        self.negation[[self.vocab[word] for word in NEGATIONS]] = True
+        self.exclamation_id = self.vocab['!']
+
+    def polarities(self, texts):
+        """
+        Polarity of each text in a batch
+
+        Args:
+            texts: Sequence of strings
+
+        Returns:
+            numpy.ndarray: Polarity per text, -1.0 to 1.0 (0.0 with no lexicon words)
+        """
+        token_lists = [tokenize(text) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+        if not lengths.sum():
+            return np.zeros(len(token_lists))
+
+        # Code each distinct token once, then look codes up as arrays
+        codes = {}
+        coded = np.fromiter((codes.setdefault(token, len(codes)) for tokens in token_lists for token in tokens),
+                            dtype=np.int64, count=int(lengths.sum()))
+        ids = np.array([self.vocab.get(token, 0) for token in codes], dtype=np.int64)[coded]
+        sizes = np.array([len(token.strip("'")) for token in codes], dtype=np.int64)[coded]
+        doc = np.repeat(np.arange(len(token_lists)), lengths)
+
+        known = self.known[ids]
+        p = self.polarity[ids].copy()
+        weight = known.astype(float)
+        position = np.arange(len(ids))
+        first = np.repeat(np.cumsum(lengths) - lengths, lengths)    # Index of each text's first token
+
+        # Short unknown tokens ("a", "is", ",") do not break the link between a
+        # negation or adverb and the word it applies to
+        unknown = ~known & ~self.negation[ids]
+        adverb_source = self._previous(~(unknown & (sizes <= 2)), position, first)
+        negation_source = self._previous(~(unknown & (sizes <= 1)), position, first)
+
+        # "very good": the adverb's assessment becomes the pair's, scaled by its intensity
+        has_adverb = adverb_source >= 0
+        adverb = ids[np.maximum(adverb_source, 0)]
+        modified = known & has_adverb & self.known[adverb] & self.modifier[adverb]
+        p[modified] *= self.intensity[adverb[modified]]
+        weight[adverb_source[modified]] = 0.0
+
+        # "not good" / "not very good": flipped and halved (intensity inverted for a pair)
+        negated = known & ~modified & self._is_negation(ids, negation_source)
+        pair_source = np.where(modified, negation_source[np.maximum(adverb_source, 0)], -1)
+        negated_pair = modified & self._is_negation(ids, pair_source)
+        p[negated_pair] /= self.intensity[adverb[negated_pair]] ** 2
+        p = np.clip(p, -1.0, 1.0)
+
+        # "good!": each exclamation mark boosts the latest assessment in its text
+        latest = np.maximum.accumulate(np.where(weight > 0, position, -1))
+        marks = np.flatnonzero(ids == self.exclamation_id)
+        boosted = latest[marks]
+        boosted = boosted[boosted >= first[marks]]
+        if len(boosted):
+            np.multiply.at(p, boosted, EXCLAMATION_BOOST)
+            p = np.clip(p, -1.0, 1.0)
+
+        p[negated | negated_pair] *= -0.5
+
+        totals = np.bincount(doc, weights=weight * p, minlength=len(token_lists))
+        counts = np.bincount(doc, weights=weight, minlength=len(token_lists))
+        return totals / np.maximum(counts, 1.0)
+
+    @staticmethod
+    def _previous(counts, position, first):
+        """
+        For each token, the index of the nearest earlier token in the same
+        text where `counts` is True (-1 if there is none)
+        """
+        latest = np.maximum.accumulate(np.where(counts, position, -1))
+        previous = np.concatenate(([-1], latest[:-1]))
+        return np.where(previous >= first, previous, -1)
+
+    def _is_negation(self, ids, source):
+        """Whether each source index points at a negation (-1 never does)"""
+        return (source >= 0) & self.negation[ids[np.maximum(source, 0)]]
+
+
+@lru_cache(maxsize=1)
+def get_lexicon():
+    """The shared LexiconSentiment (loaded on first use)"""
+    return LexiconSentiment()
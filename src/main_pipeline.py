@@ -11,9 +11,21 @@ from news_collector import fetch_news
 from news_analyzer import analyze_articles
 from viral_engine import generate_viral_content
 from image_fetcher import ImageFetcher
+from surge_stream import SurgeStream
 from config.countries import get_active_countries
 from datetime import datetime
 
+# How often the scheduler checks which feeds are due
+POLL_CHECK_MINUTES = 5
+
+# Streaming surge detector fed by every collection run of this process
+surge_stream = SurgeStream()
+
+def report_surges():
+    """Print the SURGE_ALERT stories the last collection run emitted"""
+    for story in surge_stream.drain_alerts():
+        print(f"   🚨 {story['headline']} (z = {story['data']['z_score'].iloc[0]:.1f})")
+
 def daily_job():
     """Main pipeline execution"""
     active_countries = get_active_countries()
@@ -27,7 +39,8 @@ def daily_job():
     try:
         # Step 1: Fetch news from all active countries
         print("📰 STEP 1: Fetching news...")
-        fetch_news()
+        fetch_news(stream=surge_stream)
+        report_surges()
 
         # Step 2: Analyze articles (classify topics, score virality)
         print("\n🔬 STEP 2: Analyzing articles...")
@@ -62,18 +75,29 @@ def daily_job():
 
     return 0
 
-# Schedule to run daily at 7 AM
+def poll_job():
+    """Poll only the feeds whose adaptive schedule says they are due"""
+    print(f"\n⏰ {datetime.now().strftime('%H:%M')} Polling due feeds...")
+    try:
+        fetch_news(due_only=True, stream=surge_stream)
+        report_surges()
+    except Exception as e:
+        print(f"❌ Polling failed: {str(e)}")
+
+# Poll feeds at their learned cadence; analyze and chart once a day at 7 AM
+schedule.every(POLL_CHECK_MINUTES).minutes.do(poll_job)
 schedule.every().day.at("07:00").do(daily_job)
 
 # Or run immediately for testing
 if __name__ == "__main__":
+    if '--schedule' in sys.argv:
+        print("⏰ Scheduler started. Polling due feeds every "
+              f"{POLL_CHECK_MINUTES} min, full pipeline daily at 7 AM...")
+        while True:
+            schedule.run_pending()
+            time.sleep(30)
+
     print("🧪 Running pipeline now (test mode)...\n")
     exit_code = daily_job()
 
-    # Uncomment below to run on schedule
-    # print("\n⏰ Scheduler started. Waiting for 7 AM daily run...")
-    # while True:
-    #     schedule.run_pending()
-    #     time.sleep(60)
-
     sys.exit(exit_code)
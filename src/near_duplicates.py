@@ -0,0 +1,263 @@
+# near_duplicates.py
+"""
+Cross-source near-duplicate clustering for incoming articles
+
+The same wire story reaches us from several outlets under slightly different
+headlines. Each article gets a 64-bit SimHash of its headline + summary, and
+a multi-table index over the signature's blocks finds every earlier article
+within MAX_HAMMING bits while comparing against only a fraction of them.
+Matches share a cluster_id (the id of the first article seen in the
+cluster), so downstream counts can be taken over stories instead of raw
+rows. Run this module to check the index's recall.
+"""
+
+import hashlib
+import itertools
+import re
+import time
+
+SIGNATURE_BITS = 64
+# Bits that may differ between two copies of a story. A reworded headline
+# over a shared summary lands 5-15 bits away, unrelated stories near 32;
+# every extra bit roughly quadruples chance matches (about 1 in 200 articles
+# against a 20k-article window at 12).
+MAX_HAMMING = 12
+BLOCKS = 14                  # Signature blocks; copies within MAX_HAMMING share at least BLOCKS - MAX_HAMMING
+KEY_BLOCKS = BLOCKS - MAX_HAMMING   # Blocks per table key: one table per combination (91)
+CLUSTER_WINDOW_DAYS = 3      # Syndicated copies arrive within hours, not weeks
+
+STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'are', 'was', 'were', 'has',
+    'have', 'had', 'its', 'his', 'her', 'their', 'they', 'but', 'not', 'been', 'will',
+    'after', 'over', 'into', 'about', 'who', 'what', 'which', 'when', 'more', 'than',
+    'says', 'said', 'also', 'new', 'you', 'your', 'our', 'out', 'all', 'can', 'one'
+}
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def _table_masks():
+    """
+    Signature mask of each table: one per combination of KEY_BLOCKS blocks
+
+    The 64 bits are cut into BLOCKS contiguous blocks, the first
+    SIGNATURE_BITS % BLOCKS of them one bit wider.
+    """
+    blocks, shift = [], 0
+    for block in range(BLOCKS):
+        width = SIGNATURE_BITS // BLOCKS + (1 if block < SIGNATURE_BITS % BLOCKS else 0)
+        blocks.append(((1 << width) - 1) << shift)
+        shift += width
+    return [sum(combination) for combination in itertools.combinations(blocks, KEY_BLOCKS)]
+
+
+TABLE_MASKS = _table_masks()
+
+
+def _features(text):
+    """Lowercased content words of a headline + summary (HTML stripped)"""
+    words = WORD_PATTERN.findall(TAG_PATTERN.sub(' ', text or '').lower())
+    return [word for word in words if len(word) > 2 and word not in STOPWORDS]
+
+
+def simhash(text):
+    """
+    64-bit SimHash signature of a text
+
+    Returns:
+        int: Unsigned signature (0 for text with no content words)
+    """
+    weights = [0] * SIGNATURE_BITS
+    for feature in _features(text):
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIGNATURE_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def to_signed(signature):
+    """Map an unsigned 64-bit signature into SQLite's signed INTEGER range"""
+    return signature - (1 << 64) if signature >= (1 << 63) else signature
+
+
+def to_unsigned(value):
+    """Inverse of to_signed()"""
+    return value + (1 << 64) if value < 0 else value
+
+
+class NearDuplicateIndex:
+    """
+    In-memory multi-table index over recent SimHash signatures
+
+    Signatures are cut into BLOCKS blocks and filed in one table per
+    combination of KEY_BLOCKS blocks, keyed on those blocks' bits. Two
+    signatures at most MAX_HAMMING bits apart differ in at most that many
+    blocks, so they agree on some combination and meet in its table: no
+    near-duplicate is missed, and a lookup compares against only the few
+    signatures that share a key with it.
+    """
+
+    def __init__(self, max_hamming=MAX_HAMMING):
+        if max_hamming > BLOCKS - KEY_BLOCKS:
+            raise ValueError(f"max_hamming {max_hamming} is more than the index guarantees ({BLOCKS - KEY_BLOCKS})")
+        self.max_hamming = max_hamming
+        self.buckets = {}
+        self.clusters = {}      # signature -> cluster_id; repeats are not filed again
+        self.size = 0
+
+    def _keys(self, signature):
+        return [(table, signature & mask) for table, mask in enumerate(TABLE_MASKS)]
+
+    def add(self, signature, cluster_id):
+        """Index a signature under an existing cluster"""
+        self.size += 1
+        if signature in self.clusters:
+            return
+        self.clusters[signature] = cluster_id
+        entry = (signature, cluster_id)
+        for key in self._keys(signature):
+            self.buckets.setdefault(key, []).append(entry)
+
+    def find(self, signature):
+        """
+        Cluster of the closest indexed signature within max_hamming bits
+
+        Returns:
+            str or None: Matching cluster_id
+        """
+        if signature in self.clusters:
+            return self.clusters[signature]
+        best_cluster, best_distance = None, self.max_hamming + 1
+        for key in self._keys(signature):
+            for candidate, cluster_id in self.buckets.get(key, ()):
+                distance = (candidate ^ signature).bit_count()
+                if distance < best_distance:
+                    best_cluster, best_distance = cluster_id, distance
+        return best_cluster
+
+    def assign(self, article_id, text):
+        """
+        Assign an article to a cluster, starting a new one if nothing is close
+
+        Returns:
+            tuple: (signature, cluster_id)
+        """
+        signature = simhash(text)
+        if signature == 0:
+            return signature, article_id
+        cluster_id = self.find(signature) or article_id
+        self.add(signature, cluster_id)
+        return signature, cluster_id
+
+    @classmethod
+    def load(cls, conn, days=CLUSTER_WINDOW_DAYS):
+        """Build an index from the signatures stored in the last `days` days"""
+        index = cls()
+        since = int(time.time()) - days * 86400
+        c = conn.cursor()
+        c.execute('''
+            SELECT simhash, cluster_id
+            FROM articles
+            WHERE fetched_ts >= ?
+            AND simhash IS NOT NULL
+            ORDER BY fetched_ts
+        ''', (since,))
+        for signature, cluster_id in c.fetchall():
+            if signature:
+                index.add(to_unsigned(signature), cluster_id)
+        return index
+
+
+def backfill_clusters(conn, days=CLUSTER_WINDOW_DAYS):
+    """Sign and cluster recent articles stored before clustering existed"""
+    index = NearDuplicateIndex()
+    since = int(time.time()) - days * 86400
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, headline, summary
+        FROM articles
+        WHERE fetched_ts >= ?
+        ORDER BY fetched_ts
+    ''', (since,))
+
+    updates = []
+    for article_id, headline, summary in c.fetchall():
+        signature, cluster_id = index.assign(article_id, f"{headline or ''} {summary or ''}")
+        updates.append((to_signed(signature), cluster_id, article_id))
+
+    conn.executemany('UPDATE articles SET simhash = ?, cluster_id = ? WHERE id = ?', updates)
+    return len(updates)
+
+
+if __name__ == "__main__":
+    import random
+    import string
+
+    # Self-check 1: the index finds every signature within MAX_HAMMING bits
+    rng = random.Random(0)
+    index = NearDuplicateIndex()
+    signatures = [rng.getrandbits(SIGNATURE_BITS) for _ in range(5000)]
+    for position, signature in enumerate(signatures):
+        index.add(signature, str(position))
+    for _ in range(2000):
+        signature = rng.choice(signatures)
+        for bit in rng.sample(range(SIGNATURE_BITS), rng.randint(0, MAX_HAMMING)):
+            signature ^= 1 << bit
+        assert index.find(signature) is not None, f"missed a signature {MAX_HAMMING} bits or fewer away"
+    print(f"✓ Every signature within {MAX_HAMMING} bits found ({len(TABLE_MASKS)} tables)")
+
+    # Self-check 2: recall on syndicated copies - reworded headline, shared wire summary
+    variants = [
+        ("Bank of England raises interest rates to 5.25%",
+         "Bank of England hikes interest rates to 5.25% amid inflation fight",
+         "The Bank of England has raised interest rates for the fourteenth consecutive time as it tries "
+         "to bring down inflation, taking borrowing costs to their highest level since 2008."),
+        ("Junior doctors in England to strike for five days in July",
+         "Junior doctors announce five-day walkout in July, BMA says",
+         "Junior doctors in England will stage a five-day strike next month in the longest walkout in "
+         "the history of the NHS, the British Medical Association has announced."),
+        ("Wildfires force thousands to evacuate on Greek island of Rhodes",
+         "Thousands evacuated as wildfires rage on Rhodes",
+         "Thousands of tourists and residents have been evacuated from hotels and villages on the Greek "
+         "island of Rhodes as wildfires spread for a sixth day."),
+        ("Aslef announces new overtime ban and strike dates",
+         "Train drivers union Aslef sets new strike dates",
+         "Train drivers in the Aslef union will strike on two days next month and refuse overtime for a "
+         "week, in a long-running dispute over pay with rail operators."),
+        ("Elon Musk says Twitter will rebrand as X",
+         "Twitter to be renamed X, dropping bird logo, Musk says",
+         "Elon Musk has said Twitter will change its name to X and replace its blue bird logo, as the "
+         "billionaire continues to overhaul the social media platform he bought last year."),
+    ]
+    index = NearDuplicateIndex()
+    clustered = 0
+    for story, (headline, reworded, summary) in enumerate(variants):
+        _, cluster_id = index.assign(f"{story}a", f"{headline} {summary}")
+        assert cluster_id == f"{story}a", "unrelated stories clustered together"
+        distance = (simhash(f"{headline} {summary}") ^ simhash(f"{reworded} {summary}")).bit_count()
+        _, cluster_id = index.assign(f"{story}b", f"{reworded} {summary}")
+        clustered += cluster_id == f"{story}a"
+        print(f"  {distance:2d} bits {'✓' if cluster_id == f'{story}a' else '✗'} {reworded}")
+    assert clustered >= len(variants) - 1, f"only {clustered} of {len(variants)} reworded copies clustered"
+    print(f"✓ {clustered} of {len(variants)} reworded copies clustered")
+
+    # Self-check 3: recall on 25-word texts with words swapped out
+    def random_word():
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(7))
+
+    for swapped, expected in ((1, 0.99), (2, 0.9), (3, 0.7)):
+        hits = 0
+        for _ in range(500):
+            words = [random_word() for _ in range(25)]
+            text = ' '.join(words)
+            for position in rng.sample(range(25), swapped):
+                words[position] = random_word()
+            hits += (simhash(text) ^ simhash(' '.join(words))).bit_count() <= MAX_HAMMING
+        assert hits / 500 >= expected, (swapped, hits)
+        print(f"✓ {swapped} of 25 words swapped: {hits / 500:.0%} clustered")
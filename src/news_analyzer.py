@@ -1,176 +1,353 @@
 # news_analyzer.py
 import sqlite3
 import pandas as pd
-from textblob import TextBlob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import sys
 import os
+import time
 
 # Add parent directory to path for config imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.countries import get_country_config, get_global_topics, get_viral_people
-from config.viral_topics import VIRAL_TOPICS, calculate_viral_score
-
-def count_keyword_matches(text, keywords_dict):
-    """Count how many keywords match in text"""
-    text_lower = text.lower()
-    matches = 0
-
-    if isinstance(keywords_dict, dict):
-        # Handle nested dictionaries
-        for category, keywords in keywords_dict.items():
-            if isinstance(keywords, list):
-                matches += sum(1 for keyword in keywords if keyword in text_lower)
-            elif isinstance(keywords, dict):
-                # Handle nested categories (like VIRAL_TOPICS)
-                for subcategory, subkeywords in keywords.items():
-                    matches += sum(1 for keyword in subkeywords if keyword in text_lower)
-    elif isinstance(keywords_dict, list):
-        matches = sum(1 for keyword in keywords_dict if keyword in text_lower)
-
-    return matches
-
-def classify_article_scope(text):
+from config.countries import COUNTRIES
+from config.viral_topics import calculate_viral_score
+from config.analysis import SENTIMENT_BACKEND
+from db_utils import add_column, day_start_ts
+from fingerprints import analysis_fingerprint
+from keyword_matcher import get_matcher, scan
+from topic_classifier import get_classifier
+from rollups import init_rollups, apply_rollup_delta
+from sentiment_cache import SentimentCache
+from term_index import init_term_index, replace_postings
+from lexicon_sentiment import get_lexicon
+
+# Parallel analysis settings
+ANALYSIS_CHUNK_SIZE = 500   # Articles sent to a worker at a time
+PARALLEL_MIN_ROWS = 2000    # Smaller backlogs are analyzed in-process (pool start-up costs more)
+
+PENDING_CONDITION = 'topic IS NULL OR viral_score IS NULL'
+STALE_CONDITION = 'analysis_version IS NOT ?'
+
+def classify_article_scope(text, hits=None):
     """Determine if article is LOCAL or GLOBAL"""
-    global_topics = get_global_topics()
-    global_matches = count_keyword_matches(text, global_topics)
+    return get_classifier().classify(text, hits).scope
 
-    # If matches 2+ global topics, it's global
-    if global_matches >= 2:
-        return 'GLOBAL'
-    else:
-        return 'LOCAL'
-
-def classify_topic(text, country_code):
-    """Classify topic using country-specific OR global keywords"""
-    text_lower = text.lower()
-    scores = {}
-    subcategory_scores = {}  # Track subcategories separately
-
-    # Check global topics first
-    global_topics = get_global_topics()
-    for topic, keywords in global_topics.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        scores[topic] = score
-
-    # Check country-specific topics
-    config = get_country_config(country_code)
-    if config and 'local_topics' in config:
-        for topic, keywords in config['local_topics'].items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if topic in scores:
-                scores[topic] += score
-            else:
-                scores[topic] = score
-
-    # Check viral topics (engagement-focused)
-    for topic_category, subcategories in VIRAL_TOPICS.items():
-        for subcategory, keywords in subcategories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-
-            # Track subcategories for "Other" category SEPARATELY
-            if topic_category == 'Other':
-                subcategory_scores[subcategory] = score
-                # DON'T add to main scores for "Other" - only track main categories
-                continue
-
-            # Add to main category scores for non-"Other" topics
-            if topic_category in scores:
-                scores[topic_category] += score
-            else:
-                scores[topic_category] = score
-
-    # Return topic with highest score (excluding "Other")
-    if scores:
-        # Remove "Other" temporarily to check other categories
-        other_score = scores.pop('Other', 0)
-
-        if scores:  # If there are non-"Other" topics with matches
-            max_topic = max(scores, key=scores.get)
-            if scores[max_topic] > 0:
-                return max_topic
-
-    # If no main category matched, return best subcategory from "Other"
-    if subcategory_scores:
-        best_subcategory = max(subcategory_scores, key=subcategory_scores.get)
-        # Return the subcategory if it has at least 1 match
-        if subcategory_scores[best_subcategory] >= 1:
-            return best_subcategory
-
-    return 'Other'
-
-def analyze_sentiment(text):
-    """Analyze sentiment using TextBlob"""
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity  # -1 to 1
+def classify_topic(text, country_code, hits=None):
+    """
+    Classify topic using country-specific OR global keywords
+
+    `hits` is the keyword_matcher scan of the text; see topic_classifier.py
+    for the precompiled per-country rules.
+    """
+    return get_classifier(country_code).classify(text, hits).topic
 
+def sentiment_label(polarity):
+    """Label of a polarity score"""
     if polarity > 0.1:
-        return 'positive', polarity
+        return 'positive'
     elif polarity < -0.1:
-        return 'negative', polarity
+        return 'negative'
     else:
-        return 'neutral', polarity
+        return 'neutral'
+
+def analyze_sentiment(text, polarity=None):
+    """
+    Analyze sentiment with the configured backend (skipped when a cached polarity is passed)
+
+    Returns:
+        tuple: (label, polarity)
+    """
+    if polarity is None:
+        if SENTIMENT_BACKEND == 'lexicon':
+            polarity = float(get_lexicon().polarities([text])[0])
+        else:
+            # Imported here so the lexicon backend never loads TextBlob
+            from textblob import TextBlob
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity  # -1 to 1
+
+    return sentiment_label(polarity), polarity
+
+def analyze_article(headline, summary, country, polarity=None, hits=None):
+    """
+    Classify and score one article
+
+    Args:
+        polarity: Cached sentiment polarity of the text, if known
+        hits: keyword_matcher scan of the text, if already computed
+
+    Returns:
+        tuple: (topic, sentiment, sentiment_score, scope, viral_score)
+    """
+    text = f"{headline} {summary}"
+
+    # One pass over the text finds every keyword list that matches
+    if hits is None:
+        hits = scan(text)
+
+    # Classify scope (LOCAL vs GLOBAL) and topic
+    scope, topic, _ = get_classifier(country).classify(text, hits)
+
+    # Analyze sentiment
+    sentiment, sentiment_score = analyze_sentiment(text, polarity)
+
+    # Calculate viral score
+    signals = {tag[1] for tag in hits if tag[0] == 'signal'}
+    viral_score = calculate_viral_score(headline, summary, signals)
+
+    return topic, sentiment, sentiment_score, scope, viral_score
+
+def _warm_worker():
+    """Process pool initializer: build the keyword automaton, classifiers and sentiment backend once per worker"""
+    get_matcher()
+    for country in COUNTRIES:
+        get_classifier(country)
+    analyze_sentiment('warm up')
+
+def _analyze_chunk(rows):
+    """
+    Analyze rows annotated by SentimentCache.annotate()
+
+    Texts repeated within the chunk are scored once. With the lexicon
+    backend every uncached text of the chunk is scored in one batch. The
+    keyword matches that drive classification are also returned as term
+    postings (see term_index.py).
+
+    Returns:
+        tuple: (results, postings) - a (topic, sentiment, sentiment_score,
+               scope, viral_score, id) tuple per row, and
+               (id, term, whole_word) tuples
+    """
+    matcher = get_matcher()
+    scored = {}
+    if SENTIMENT_BACKEND == 'lexicon':
+        batch = {row[4]: f"{row[1]} {row[2]}" for row in rows if row[5] is None}
+        if batch:
+            scored = dict(zip(batch, get_lexicon().polarities(list(batch.values())).tolist()))
+    results = []
+    postings = []
+    for article_id, headline, summary, country, text_hash, polarity in rows:
+        if polarity is None:
+            polarity = scored.get(text_hash)
+        matches = matcher.matches(f"{headline} {summary}")
+        result = analyze_article(headline, summary, country, polarity, matcher.tags_of(matches))
+        scored[text_hash] = result[2]
+        results.append((*result, article_id))
+        postings.extend((article_id, term, int(whole_word)) for term, whole_word in matches.items())
+    return results, postings
+
+def iter_pending_chunks(conn, chunk_size=ANALYSIS_CHUNK_SIZE, condition=PENDING_CONDITION, params=()):
+    """
+    Read unanalyzed articles in fixed-size chunks, keyset-paginated on rowid
+
+    Each chunk is read only after the previous one was handed on, so memory
+    stays bounded by the chunk size however large the backlog is.
+
+    Args:
+        condition: SQL condition selecting the rows to analyze (default: never analyzed)
+        params: Parameters of the condition
+
+    Yields:
+        list: (id, headline, summary, country) rows
+    """
+    last_rowid = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT rowid, id, headline, summary, country
+            FROM articles
+            WHERE rowid > ?
+            AND ({condition})
+            ORDER BY rowid
+            LIMIT ?
+        ''', (last_rowid, *params, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+        yield [row[1:] for row in rows]
+
+def iter_analysis_results(chunks, workers=None, total=0):
+    """
+    Analyze chunks of rows, across processes when the backlog is large
+
+    Results are yielded in input order. At most two chunks per worker are
+    in flight, so a streaming input is never read far ahead of the writer.
+
+    Args:
+        chunks: Iterable of row lists annotated by SentimentCache.annotate()
+        workers: Worker processes (None = one per core, 1 = in-process)
+        total: Number of rows expected, used to decide whether a pool pays off
+
+    Yields:
+        tuple: Results and term postings of one chunk (see _analyze_chunk)
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or total < PARALLEL_MIN_ROWS:
+        for chunk in chunks:
+            yield _analyze_chunk(chunk)
+        return
 
-def analyze_articles():
-    """Analyze all articles with updated logic"""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
+    workers = min(workers, -(-total // ANALYSIS_CHUNK_SIZE))
+    print(f"  Using {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_analyze_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def write_analysis_results(conn, results, fingerprint=None, postings=None):
+    """
+    Apply a batch of analysis results with one set-based UPDATE
+
+    Results are staged in a temp table and joined onto articles with
+    UPDATE ... FROM, instead of one UPDATE statement per row. Not committed
+    here. SQLite older than 3.33 has no UPDATE ... FROM and gets a plain
+    executemany instead.
+
+    article_rollups (see rollups.py) is kept in step: the old contribution
+    of re-analyzed rows is taken out before the update and the new one
+    added after it. Given postings replace the rows' stored terms.
+
+    Args:
+        conn: Open SQLite connection (with init_rollups() and init_term_index() run on it)
+        results: Tuples of (topic, sentiment, sentiment_score, scope, viral_score, id)
+        fingerprint: analysis_fingerprint() the rows were analyzed under (None = current)
+        postings: (id, term, whole_word) keyword matches of the rows, if any were kept
+    """
+    if fingerprint is None:
+        fingerprint = analysis_fingerprint()
+
+    conn.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS analysis_results (
+            id TEXT PRIMARY KEY,
+            topic TEXT,
+            sentiment TEXT,
+            sentiment_score REAL,
+            scope TEXT,
+            viral_score REAL
+        )
+    ''')
+    conn.execute('DELETE FROM analysis_results')
+    conn.executemany('''
+        INSERT OR REPLACE INTO analysis_results (topic, sentiment, sentiment_score, scope, viral_score, id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', results)
+
+    apply_rollup_delta(conn, 'analysis_results', -1)
+
+    if sqlite3.sqlite_version_info < (3, 33, 0):
+        conn.executemany('''
+            UPDATE articles
+            SET topic = ?, sentiment = ?, sentiment_score = ?, scope = ?, viral_score = ?,
+                analysis_version = ?
+            WHERE id = ?
+        ''', (result[:5] + (fingerprint, result[5]) for result in results))
+    else:
+        conn.execute('''
+            UPDATE articles
+            SET topic = r.topic,
+                sentiment = r.sentiment,
+                sentiment_score = r.sentiment_score,
+                scope = r.scope,
+                viral_score = r.viral_score,
+                analysis_version = ?
+            FROM analysis_results AS r
+            WHERE articles.id = r.id
+        ''', (fingerprint,))
+
+    apply_rollup_delta(conn, 'analysis_results', 1)
+
+    if postings is not None:
+        replace_postings(conn, 'analysis_results', postings)
+
+def analyze_articles(workers=None, db_path=None, reanalyze=False, days=None):
+    """
+    Analyze all articles with updated logic
+
+    Args:
+        workers: Worker processes for large backlogs (None = one per core, 1 = single process)
+        db_path: Optional database file instead of data/tagtaly.db
+        reanalyze: Also re-score rows analyzed under an older analysis_fingerprint()
+                   (after a taxonomy edit), not only unanalyzed ones
+        days: With reanalyze, only re-score stale rows fetched in the last N days
+    """
+    if db_path is None:
+        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
     conn = sqlite3.connect(db_path)
-
-    # Fetch unanalyzed articles
-    df = pd.read_sql_query(
-        "SELECT * FROM articles WHERE topic IS NULL OR viral_score IS NULL",
-        conn
-    )
-
-    if len(df) == 0:
+    add_column(conn, 'articles', 'analysis_version', 'TEXT')
+    init_rollups(conn)
+    init_term_index(conn)
+    fingerprint = analysis_fingerprint()
+
+    condition, params = PENDING_CONDITION, ()
+    if reanalyze:
+        stale, stale_params = STALE_CONDITION, (fingerprint,)
+        if days is not None:
+            stale += ' AND fetched_ts >= ?'
+            stale_params += (day_start_ts(days),)
+        condition, params = f'({PENDING_CONDITION}) OR ({stale})', stale_params
+
+    # Count the rows to analyze; the rows themselves are streamed in chunks
+    pending = conn.execute(
+        f"SELECT COUNT(*) FROM articles WHERE {condition}", params
+    ).fetchone()[0]
+
+    if pending == 0:
         print("No articles to analyze")
         conn.close()
         return
 
-    print(f"Analyzing {len(df)} articles...")
-
-    for idx, row in df.iterrows():
-        text = f"{row['headline']} {row['summary']}"
-
-        # Classify scope (LOCAL vs GLOBAL)
-        scope = classify_article_scope(text)
-
-        # Classify topic
-        topic = classify_topic(text, row['country'])
-
-        # Analyze sentiment
-        sentiment, sentiment_score = analyze_sentiment(text)
-
-        # Calculate viral score
-        viral_score = calculate_viral_score(row['headline'], row['summary'])
-
-        # Update database
-        conn.execute('''
-            UPDATE articles
-            SET topic = ?, sentiment = ?, sentiment_score = ?, scope = ?, viral_score = ?
-            WHERE id = ?
-        ''', (topic, sentiment, sentiment_score, scope, viral_score, row['id']))
-
-        if (idx + 1) % 50 == 0:
-            print(f"  Processed {idx + 1}/{len(df)} articles...")
-            conn.commit()
+    if reanalyze:
+        window = f" from the last {days} days" if days is not None else ""
+        print(f"Re-analyzing {pending} unanalyzed or stale articles{window} (fingerprint {fingerprint})...")
+    else:
+        print(f"Analyzing {pending} articles...")
+
+    processed = 0
+    write_seconds = 0.0
+    started = time.perf_counter()
+
+    # Workers only compute; this process is the single writer. Each chunk is
+    # committed as it lands, and analyzed rows are stamped with the current
+    # fingerprint (so no longer pending or stale), so a run that dies
+    # part-way resumes after the last committed chunk. Sentiment does not
+    # depend on the taxonomies, so re-analyzed rows mostly hit the cache.
+    cache = SentimentCache(conn, backend=SENTIMENT_BACKEND)
+    chunks = (cache.annotate(chunk) for chunk in iter_pending_chunks(conn, condition=condition, params=params))
+    for results, postings in iter_analysis_results(chunks, workers, total=pending):
+        write_started = time.perf_counter()
+        write_analysis_results(conn, results, fingerprint, postings)
+        cache.record(results)
+        cache.flush()
+        conn.commit()
+        write_seconds += time.perf_counter() - write_started
+
+        processed += len(results)
+        print(f"  Processed {processed}/{pending} articles...")
+
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    print(f"  Write-back: {write_seconds:.2f}s of {elapsed:.2f}s ({write_seconds / elapsed * 100:.0f}%)")
+    print(f"  Sentiment cache: {cache.hits} hits, {cache.misses} misses "
+          f"({cache.hit_rate() * 100:.0f}% hit rate)")
 
     conn.commit()
     conn.close()
     print("✓ Analysis complete!")
 
-    # Print summary
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
+    # Print summary (from the rollups, so O(groups) rather than O(articles))
     conn = sqlite3.connect(db_path)
     summary = pd.read_sql_query('''
         SELECT
             country,
             scope,
             topic,
-            COUNT(*) as count,
-            AVG(viral_score) as avg_viral_score
-        FROM articles
-        WHERE viral_score IS NOT NULL
+            SUM(article_count) as count,
+            SUM(viral_sum) / SUM(article_count) as avg_viral_score
+        FROM article_rollups
         GROUP BY country, scope, topic
         ORDER BY country, avg_viral_score DESC
     ''', conn)
@@ -180,4 +357,18 @@ def analyze_articles():
     print(summary.to_string())
 
 if __name__ == "__main__":
-    analyze_articles()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Classify and score unanalyzed articles')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for large backlogs (default: one per core, 1 = single process)')
+    parser.add_argument('--reanalyze', action='store_true',
+                        help='Also re-score articles analyzed under an older taxonomy config')
+    parser.add_argument('--days', type=int, default=None,
+                        help='With --reanalyze, only re-score articles fetched in the last N days')
+    args = parser.parse_args()
+
+    if args.days is not None and not args.reanalyze:
+        parser.error('--days only applies with --reanalyze')
+
+    analyze_articles(workers=args.workers, reanalyze=args.reanalyze, days=args.days)
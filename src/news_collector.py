@@ -2,6 +2,11 @@
 import feedparser
 import sqlite3
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from urllib.parse import urlparse
+import threading
+import calendar
 import hashlib
 import sys
 import os
@@ -12,13 +17,32 @@ import requests
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.countries import get_active_countries, get_country_config
+from db_utils import add_column
+from feed_state import (init_feed_state, load_feed_states, record_feed_fetch,
+                        record_feed_failure, circuit_status, print_feed_report)
+from feed_scheduler import filter_due_feeds, update_schedule, print_schedule
+from near_duplicates import NearDuplicateIndex, backfill_clusters, to_signed
+from feed_replay import save_recording, write_recording_index
+from claims import store_claims, init_claims
+from surge_stream import story_ts
 
 # Set User-Agent for feedparser to avoid rejection
 feedparser.USER_AGENT = 'Tagtaly/1.0 (+http://tagtaly.com) news aggregator'
 
-def init_database():
-    """Initialize database with updated schema"""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
+# Concurrent collection settings
+MAX_FETCH_WORKERS = 16      # Feeds downloaded at once across all countries
+PER_HOST_LIMIT = 2          # Max simultaneous requests to a single host
+FETCH_DEADLINE = 90         # Seconds before the whole collection step gives up
+REQUEST_TIMEOUT = 10        # Seconds a single feed request may take
+
+# Incremental parsing settings
+SEEN_ID_DAYS = 3            # How far back stored article IDs are preloaded
+EARLY_STOP_RUN = 5          # Consecutive already-stored entries before a feed is abandoned
+
+def init_database(db_path=None):
+    """Initialize database with updated schema (data/tagtaly.db unless `db_path` is given)"""
+    if db_path is None:
+        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
     conn = sqlite3.connect(db_path)
     c = conn.cursor()
     c.execute('''
@@ -35,90 +59,381 @@ def init_database():
             topic TEXT,
             sentiment TEXT,
             sentiment_score REAL,
-            viral_score REAL DEFAULT 0
+            viral_score REAL DEFAULT 0,
+            published_ts INTEGER,
+            fetched_ts INTEGER,
+            simhash INTEGER,
+            cluster_id TEXT
         )
     ''')
 
+    # Epoch timestamps so time windows are plain range predicates
+    if add_column(conn, 'articles', 'fetched_ts', 'INTEGER'):
+        c.execute("UPDATE articles SET fetched_ts = CAST(strftime('%s', fetched_at, 'utc') AS INTEGER)")
+    if add_column(conn, 'articles', 'published_ts', 'INTEGER'):
+        backfill_published_ts(conn)
+
+    # Near-duplicate clustering of syndicated stories
+    add_column(conn, 'articles', 'simhash', 'INTEGER')
+    if add_column(conn, 'articles', 'cluster_id', 'TEXT'):
+        backfill_clusters(conn)
+
     # Create indexes
     c.execute('CREATE INDEX IF NOT EXISTS idx_country ON articles(country)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_scope ON articles(scope)')
     c.execute('CREATE INDEX IF NOT EXISTS idx_viral_score ON articles(viral_score)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_country_fetched ON articles(country, fetched_ts, viral_score)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_fetched ON articles(fetched_ts, viral_score)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_cluster ON articles(cluster_id, country)')
 
     conn.commit()
+    init_feed_state(conn)
+
+    # Numeric claims, extracted once at ingest
+    init_claims(conn)
     return conn
 
-def fetch_feed_with_retry(url, source, max_retries=3, timeout=10):
+def parse_published(value):
+    """Parse an RSS published string into a POSIX timestamp (None if unparseable)"""
+    if not value:
+        return None
+    try:
+        return int(parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+def entry_published_ts(entry):
+    """POSIX timestamp of a feed entry, from feedparser's parsed date when available"""
+    parsed = entry.get('published_parsed')
+    if parsed:
+        return calendar.timegm(parsed)
+    return parse_published(entry.get('published', ''))
+
+def backfill_published_ts(conn):
+    """Fill published_ts for rows stored before the column existed"""
+    c = conn.cursor()
+    c.execute("SELECT id, published_date FROM articles WHERE published_date <> ''")
+    updates = [(parse_published(published_date), article_id) for article_id, published_date in c.fetchall()]
+    conn.executemany('UPDATE articles SET published_ts = ? WHERE id = ?', updates)
+
+def fetch_feed_with_retry(url, source, max_retries=3, timeout=REQUEST_TIMEOUT, deadline=None, state=None,
+                          record_dir=None):
     """
     Fetch RSS feed with retry logic and timeout handling
 
+    When `state` holds the validators of the previous fetch, the request is
+    sent as a conditional GET. A 304 response, or a 200 whose body hashes to
+    the stored content hash, is returned as an empty result with status 304
+    so the caller can skip parsing and inserting.
+
     Args:
         url: RSS feed URL
         source: Source name for logging
         max_retries: Number of retry attempts
         timeout: Request timeout in seconds
+        deadline: Optional time.monotonic() value after which no retry is attempted
+        state: Optional dict with 'etag', 'last_modified' and 'content_hash'
+        record_dir: Optional directory every downloaded body is saved to (see feed_replay.py);
+                    recording ignores `state` so unchanged feeds are downloaded too
 
     Returns:
-        feedparser result or None if failed
+        feedparser result (carrying etag, modified and content_hash) or None if failed
     """
+    if record_dir:
+        state = None
+    headers = {'User-Agent': feedparser.USER_AGENT}
+    if state:
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
     for attempt in range(max_retries):
         try:
-            # Use timeout parameter
-            feed = feedparser.parse(url, agent='Tagtaly/1.0 (+http://tagtaly.com)')
+            response = requests.get(url, headers=headers, timeout=timeout)
 
             # Check for HTTP errors
-            if hasattr(feed, 'status'):
-                if feed.status == 200:
-                    return feed
-                elif feed.status >= 500:
-                    # Server error - retry
-                    print(f"    Attempt {attempt + 1}/{max_retries}: Server error (HTTP {feed.status}), retrying...")
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                    continue
-                else:
-                    print(f"    Error: HTTP {feed.status} - {feed.get('bozo_exception', 'Unknown error')}")
-                    return None
-
-            # If we got here, assume success
-            return feed
+            if response.status_code == 304:
+                return feedparser.FeedParserDict(
+                    status=304,
+                    entries=[],
+                    etag=response.headers.get('ETag'),
+                    modified=response.headers.get('Last-Modified')
+                )
+            elif response.status_code == 200:
+                if record_dir:
+                    save_recording(record_dir, url, response.content)
+
+                content_hash = hashlib.sha1(response.content).hexdigest()
+                validators = {
+                    'etag': response.headers.get('ETag'),
+                    'modified': response.headers.get('Last-Modified'),
+                    'content_hash': content_hash
+                }
+
+                # Server ignored the validators but sent the same body
+                if state and state.get('content_hash') == content_hash:
+                    return feedparser.FeedParserDict(
+                        status=304, entries=[], bytes=len(response.content), **validators
+                    )
+
+                feed = feedparser.parse(response.content)
+                feed['status'] = 200
+                feed['bytes'] = len(response.content)
+                feed.update(validators)
+                return feed
+            elif response.status_code >= 500:
+                # Server error - retry
+                print(f"    {source} attempt {attempt + 1}/{max_retries}: Server error (HTTP {response.status_code}), retrying...")
+                wait_time = 2 ** attempt  # Exponential backoff
+            else:
+                print(f"    {source} error: HTTP {response.status_code}")
+                return None
 
         except Exception as e:
-            print(f"    Attempt {attempt + 1}/{max_retries}: {type(e).__name__}: {str(e)[:80]}")
+            print(f"    {source} attempt {attempt + 1}/{max_retries}: {type(e).__name__}: {str(e)[:80]}")
+            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
 
-            if attempt < max_retries - 1:
-                wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                print(f"    Waiting {wait_time}s before retry...")
-                time.sleep(wait_time)
-            else:
-                print(f"    ✗ Failed to fetch {source} after {max_retries} attempts")
+        if attempt < max_retries - 1:
+            if deadline is not None and time.monotonic() + wait_time >= deadline:
+                print(f"    ✗ {source}: no time left before the collection deadline")
                 return None
+            print(f"    Waiting {wait_time}s before retry...")
+            time.sleep(wait_time)
 
+    print(f"    ✗ Failed to fetch {source} after {max_retries} attempts")
     return None
 
 
-def fetch_news_for_country(country_code, conn):
-    """Fetch news for a specific country with improved error handling"""
+def load_seen_ids(conn, days=SEEN_ID_DAYS):
+    """
+    Preload the IDs of recently stored articles, grouped by feed
+
+    Args:
+        conn: Open SQLite connection
+        days: Look-back window in days
+
+    Returns:
+        dict: (country, source) -> set of article IDs
+    """
+    since = int(time.time()) - days * 86400
+    c = conn.cursor()
+    c.execute('SELECT country, source, id FROM articles WHERE fetched_ts >= ?', (since,))
+
+    seen = {}
+    for country, source, article_id in c.fetchall():
+        seen.setdefault((country, source), set()).add(article_id)
+    return seen
+
+
+class ArticleWriter:
+    """
+    Buffer feed entries and write them to SQLite in batches
+
+    Rows are written with executemany every `batch_size` rows and the whole
+    collection run is committed as one transaction by close(). Inserted and
+    duplicate counts are exact: a row counts as inserted only if SQLite
+    actually added it, so INSERT OR IGNORE hits are reported as duplicates.
+
+    Feeds list newest entries first, so once a feed yields `early_stop_run`
+    consecutive entries already stored in the last few days, the rest of
+    that feed is skipped without building rows for it.
+
+    Each new entry is signed and assigned a cluster_id so syndicated copies
+    of the same story from different outlets group together, and its
+    numeric claims are extracted into the claims table. With a SurgeStream
+    attached, every newly stored story is also fed to it by close(), in
+    publish order, so a backlog advances the stream's hours in sequence. A
+    cluster counts once per country: its first copy there, unless an earlier
+    run already stored one.
+    """
+
+    def __init__(self, conn, batch_size=500, early_stop_run=EARLY_STOP_RUN, stream=None):
+        self.conn = conn
+        self.stream = stream
+        self.batch_size = batch_size
+        self.early_stop_run = early_stop_run
+        self.fetched_at = datetime.now().isoformat()
+        self.fetched_ts = int(time.time())
+        self.seen_ids = load_seen_ids(conn)
+        self.clusters = NearDuplicateIndex.load(conn)
+        self.rows = []
+        self.new_stories = []       # (story_ts, (country, cluster), headline, summary, published_ts, fetched_ts) for the stream
+        self.inserted = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    def add_entries(self, country_code, source, entries):
+        """
+        Queue the entries of one parsed feed
+
+        Returns:
+            int: Number of entries queued
+        """
+        seen = self.seen_ids.get((country_code, source), set())
+        queued = 0
+        seen_run = 0
+        for position, entry in enumerate(entries):
+            try:
+                # Create unique ID from country + URL
+                article_id = hashlib.md5(f"{country_code}:{entry.link}".encode()).hexdigest()
+
+                if article_id in seen:
+                    self.duplicates += 1
+                    seen_run += 1
+                    if seen_run >= self.early_stop_run:
+                        self.skipped += len(entries) - position - 1
+                        break
+                    continue
+                seen_run = 0
+
+                summary = entry.get('summary', '')
+                signature, cluster_id = self.clusters.assign(article_id, f"{entry.title} {summary}")
+
+                self.rows.append((
+                    article_id,
+                    entry.title,
+                    source,
+                    entry.link,
+                    entry.get('published', ''),
+                    summary,
+                    self.fetched_at,
+                    country_code,
+                    entry_published_ts(entry),
+                    self.fetched_ts,
+                    to_signed(signature),
+                    cluster_id
+                ))
+                queued += 1
+            except Exception as e:
+                print(f"\n      Skipping malformed entry from {source}: {str(e)[:60]}")
+
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+        return queued
+
+    def flush(self):
+        """Write queued rows with a single executemany"""
+        if not self.rows:
+            return
+        if self.stream is not None:
+            placeholders = ', '.join('?' * len(self.rows))
+            stored = {row[0] for row in self.conn.execute(
+                f'SELECT id FROM articles WHERE id IN ({placeholders})', [row[0] for row in self.rows]
+            )}
+            # Clusters that already had a story in the country before this run
+            clusters = {row[11] for row in self.rows if row[11] is not None}
+            placeholders = ', '.join('?' * len(clusters))
+            earlier = set(self.conn.execute(
+                f'SELECT DISTINCT country, cluster_id FROM articles WHERE cluster_id IN ({placeholders}) AND fetched_at != ?',
+                [*clusters, self.fetched_at]
+            )) if clusters else set()
+        before = self.conn.total_changes
+        self.conn.executemany('''
+            INSERT OR IGNORE INTO articles
+            (id, headline, source, url, published_date, summary, fetched_at, country,
+             published_ts, fetched_ts, simhash, cluster_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', self.rows)
+        inserted = self.conn.total_changes - before
+        self.inserted += inserted
+        self.duplicates += len(self.rows) - inserted
+        store_claims(self.conn, [(row[0], row[1], row[5], row[7], row[9]) for row in self.rows])
+        if self.stream is not None:
+            for row in self.rows:
+                article_id, country = row[0], row[7]
+                key = (country, row[11] or article_id)
+                if article_id not in stored and key not in earlier:
+                    stored.add(article_id)
+                    self.new_stories.append((story_ts(row[8], row[9]), key, row[1], row[5], row[8], row[9]))
+        self.rows = []
+
+    def close(self):
+        """Flush remaining rows, commit the run, feed the stream and print throughput"""
+        self.flush()
+        self.conn.commit()
+        self.new_stories.sort(key=lambda story: story[0])
+        counted = set()
+        for _, key, *story in self.new_stories:
+            if key not in counted:
+                counted.add(key)
+                self.stream.observe_article(key[0], *story)
+        self.new_stories = []
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        print(f"  Stored: {self.inserted} new, {self.duplicates} duplicates, "
+              f"{self.skipped} skipped after early stop "
+              f"({self.processed / elapsed:.0f} entries/s over {elapsed:.1f}s)")
+        return self.inserted
+
+    @property
+    def processed(self):
+        """Feed entries handled so far: inserted, duplicates and skipped after early stop"""
+        return self.inserted + self.duplicates + self.skipped
+
+
+def fetch_news_for_country(country_code, conn, writer=None, feeds=None, record_dir=None):
+    """
+    Fetch news for a specific country with improved error handling
+
+    Args:
+        country_code: Country to fetch
+        conn: Open SQLite connection
+        writer: Shared ArticleWriter; when omitted one is created and committed here
+        feeds: Optional dict of source -> URL to fetch instead of the configured feeds
+        record_dir: Optional directory to record raw feed bodies to
+
+    Returns:
+        int: Number of entries queued (new articles when no writer is passed)
+    """
     config = get_country_config(country_code)
     if not config:
         print(f"No configuration found for {country_code}")
         return 0
 
-    c = conn.cursor()
+    own_writer = writer is None
+    if own_writer:
+        writer = ArticleWriter(conn)
+
     total_articles = 0
     successful_sources = 0
     failed_sources = 0
+    skipped_sources = 0
+
+    states = load_feed_states(conn)
 
     print(f"\n{config['flag']} Fetching news for {config['name']}...")
 
-    for source, url in config['feeds'].items():
+    if feeds is None:
+        feeds = config['feeds']
+
+    for source, url in feeds.items():
         print(f"  🔄 {source}...", end='', flush=True)
 
-        feed = fetch_feed_with_retry(url, source)
+        state = states.get(url)
+        circuit = circuit_status(state)
+        if circuit == 'open':
+            skipped_sources += 1
+            print(f"  ⛔ Skipped (circuit open until {state['circuit_open_until'][11:16]})")
+            continue
+
+        started = time.monotonic()
+        feed = fetch_feed_with_retry(url, source, state=state, record_dir=record_dir,
+                                     max_retries=1 if circuit == 'half_open' else 3)
+        elapsed = time.monotonic() - started
 
         if feed is None:
+            record_feed_failure(conn, url, source, country_code, elapsed)
             failed_sources += 1
             print(f"  ✗ Failed")
             continue
 
+        if feed.get('status') == 304:
+            record_feed_fetch(conn, url, source, country_code, feed, elapsed)
+            successful_sources += 1
+            print(f"  ✓ Not modified")
+            continue
+
         # Check for parsing errors
         if hasattr(feed, 'bozo') and feed.bozo:
             print(f"  ⚠️  Parse warning (but continuing): {feed.bozo_exception}")
@@ -127,54 +442,268 @@ def fetch_news_for_country(country_code, conn):
         entry_count = len(feed.entries) if hasattr(feed, 'entries') else 0
 
         if entry_count == 0:
+            record_feed_fetch(conn, url, source, country_code, feed, elapsed)
             print(f"  ⚠️  No articles found")
             continue
 
-        for entry in feed.entries:
-            try:
-                # Create unique ID from country + URL
-                article_id = hashlib.md5(f"{country_code}:{entry.link}".encode()).hexdigest()
+        total_articles += writer.add_entries(country_code, source, feed.entries)
+        record_feed_fetch(conn, url, source, country_code, feed, elapsed)
+        successful_sources += 1
+        print(f"  ✓ {entry_count} articles")
 
-                c.execute('''
-                    INSERT OR IGNORE INTO articles
-                    (id, headline, source, url, published_date, summary, fetched_at, country)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    article_id,
-                    entry.title,
-                    source,
-                    entry.link,
-                    entry.get('published', ''),
-                    entry.get('summary', ''),
-                    datetime.now().isoformat(),
-                    country_code
-                ))
-                total_articles += 1
+    print(f"\n  Summary: {successful_sources} sources successful, {failed_sources} failed, "
+          f"{skipped_sources} skipped by circuit breaker")
+    if own_writer:
+        return writer.close()
+    return total_articles
+
+def get_feed_jobs(countries):
+    """
+    List the feeds of the given countries
+
+    Returns:
+        list: (country, source, url) tuples
+    """
+    jobs = []
+    for country_code in countries:
+        config = get_country_config(country_code)
+        if not config:
+            print(f"No configuration found for {country_code}")
+            continue
+        for source, url in config['feeds'].items():
+            jobs.append((country_code, source, url))
+    return jobs
+
+
+def fetch_news_concurrently(conn, jobs, writer, max_workers=MAX_FETCH_WORKERS,
+                            per_host_limit=PER_HOST_LIMIT, deadline_seconds=FETCH_DEADLINE,
+                            record_dir=None, not_polled=None):
+    """
+    Download many feeds at once and store results as they arrive
+
+    Downloads run in a bounded thread pool with a per-host cap so one publisher
+    is never hit with more than `per_host_limit` requests at a time. Parsed
+    feeds are handed back to this thread, which is the only one writing to
+    SQLite. When the deadline passes, feeds that never got a worker or host
+    slot, or whose request had not yet had REQUEST_TIMEOUT seconds, are
+    abandoned as not polled: nothing is recorded against them and they stay
+    due. Only fetches that had already run that long count as timeouts.
+    Feeds whose circuit breaker is open are not requested at all.
+
+    Args:
+        conn: Open SQLite connection
+        jobs: List of (country, source, url) to fetch
+        writer: ArticleWriter receiving the parsed entries
+        max_workers: Thread pool size
+        per_host_limit: Simultaneous requests allowed per host
+        deadline_seconds: Wall-clock budget for the whole collection step
+        record_dir: Optional directory to record raw feed bodies to
+        not_polled: Optional list that receives the jobs never requested
+                    before the deadline, so they stay due
+
+    Returns:
+        int: Number of entries queued
+    """
+    states = load_feed_states(conn)
+
+    open_circuits = [job for job in jobs if circuit_status(states.get(job[2])) == 'open']
+    for country_code, source, url in open_circuits:
+        print(f"  ⛔ {source}: skipped, circuit open until {states[url]['circuit_open_until'][11:16]}")
+    jobs = [job for job in jobs if job not in open_circuits]
+
+    if not jobs:
+        return 0
+
+    host_slots = {}
+    for _, _, url in jobs:
+        host = urlparse(url).netloc
+        if host not in host_slots:
+            host_slots[host] = threading.BoundedSemaphore(per_host_limit)
+
+    deadline = time.monotonic() + deadline_seconds
+    fetch_started = {}          # url -> monotonic time its request began
+
+    def fetch_job(country_code, source, url):
+        with host_slots[urlparse(url).netloc]:
+            started = time.monotonic()
+            if started >= deadline:
+                return None     # Got its host slot too late; never requested
+            fetch_started[url] = started
+            state = states.get(url)
+            # A feed whose cooling period has ended gets a single probe, no retries
+            max_retries = 1 if circuit_status(state) == 'half_open' else 3
+            feed = fetch_feed_with_retry(url, source, max_retries=max_retries,
+                                         deadline=deadline, state=state, record_dir=record_dir)
+            return feed, time.monotonic() - started
+
+    print(f"\n⚡ Fetching {len(jobs)} feeds concurrently "
+          f"({max_workers} workers, {per_host_limit} per host, {deadline_seconds}s deadline)...")
+
+    total_articles = 0
+    successful_sources = 0
+    failed_sources = 0
+    cache_hits = 0
+    skipped = []
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(fetch_job, *job): job for job in jobs}
+    pending = set(futures)
+
+    try:
+        for future in as_completed(futures, timeout=max(deadline - time.monotonic(), 0)):
+            pending.discard(future)
+            country_code, source, url = futures[future]
+            flag = get_country_config(country_code)['flag']
+
+            try:
+                outcome = future.result()
             except Exception as e:
-                print(f"\n      DB Error inserting article: {str(e)[:60]}")
+                outcome = None, 0.0
+                print(f"    {source}: {type(e).__name__}: {str(e)[:80]}")
+
+            if outcome is None:
+                skipped.append(futures[future])
+                print(f"  {flag} ⏭️  {source}: not polled before the {deadline_seconds}s deadline")
+                continue
+            feed, elapsed = outcome
+
+            if feed is None:
+                record_feed_failure(conn, url, source, country_code, elapsed)
+                failed_sources += 1
+                print(f"  {flag} ✗ {source}: Failed")
+                continue
+
+            if feed.get('status') == 304:
+                record_feed_fetch(conn, url, source, country_code, feed, elapsed)
+                successful_sources += 1
+                cache_hits += 1
+                print(f"  {flag} ✓ {source}: Not modified")
+                continue
+
+            if hasattr(feed, 'bozo') and feed.bozo:
+                print(f"  {flag} ⚠️  {source}: Parse warning (but continuing): {feed.bozo_exception}")
+
+            entry_count = len(feed.entries) if hasattr(feed, 'entries') else 0
+            if entry_count == 0:
+                record_feed_fetch(conn, url, source, country_code, feed, elapsed)
+                print(f"  {flag} ⚠️  {source}: No articles found")
+                continue
+
+            total_articles += writer.add_entries(country_code, source, feed.entries)
+            record_feed_fetch(conn, url, source, country_code, feed, elapsed)
+            successful_sources += 1
+            print(f"  {flag} ✓ {source}: {entry_count} articles")
+
+    except FuturesTimeout:
+        now = time.monotonic()
+        for future in pending:
+            country_code, source, url = futures[future]
+            # Queued jobs are cancelled; running ones still waiting for their
+            # host slot will not send a request either. A request cut short
+            # by the deadline says nothing about the feed's health.
+            elapsed = now - fetch_started.get(url, now)
+            if future.cancel() or elapsed < REQUEST_TIMEOUT:
+                skipped.append(futures[future])
+                print(f"  ⏭️  {source}: not polled before the {deadline_seconds}s deadline")
+                continue
+            record_feed_failure(conn, url, source, country_code, elapsed)
+            failed_sources += 1
+            print(f"  ⏱️  {source}: gave up at the {deadline_seconds}s deadline")
 
-        conn.commit()
-        successful_sources += 1
-        print(f"  ✓ {entry_count} articles")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    print(f"\n  Summary: {successful_sources} sources successful, {failed_sources} failed")
+    if not_polled is not None:
+        not_polled.extend(skipped)
+
+    print(f"\n  Summary: {successful_sources} sources successful, {failed_sources} failed, "
+          f"{len(skipped)} not polled, {len(open_circuits)} skipped by circuit breaker")
+    print(f"  Cache: {cache_hits} not modified, {successful_sources - cache_hits} downloaded and parsed")
     return total_articles
 
-def fetch_news():
-    """Fetch news from all active countries"""
-    conn = init_database()
-    active_countries = get_active_countries()
 
-    print(f"Active countries: {', '.join(active_countries)}")
+def fetch_news(concurrent=True, due_only=False, jobs=None, db_path=None, record_dir=None, stream=None,
+               verbose=None, stats=None):
+    """
+    Fetch news from all active countries
 
-    total_count = 0
-    for country in active_countries:
-        count = fetch_news_for_country(country, conn)
-        total_count += count
+    Args:
+        concurrent: Fetch every feed at once (default) instead of one by one
+        due_only: Only poll feeds whose adaptive schedule says they are due
+        jobs: Optional list of (country, source, url) to poll instead of the
+              active countries' feeds (used by the replay benchmark)
+        db_path: Optional database file instead of data/tagtaly.db
+        record_dir: Optional directory to record raw feed bodies to for replay
+        stream: Optional SurgeStream fed with the new stories (restored from and
+                checkpointed to SQLite around the run)
+        verbose: Print the feed health ledger and polling schedule after the run
+                 (default: only for full runs, not due_only polls)
+        stats: Optional dict filled with the run's entry counts (inserted,
+               duplicates, skipped, processed), e.g. for the benchmark
 
+    Returns:
+        int: Number of new articles stored
+    """
+    if verbose is None:
+        verbose = not due_only
+    conn = init_database(db_path)
+
+    if jobs is None:
+        active_countries = get_active_countries()
+        if verbose:
+            print(f"Active countries: {', '.join(active_countries)}")
+        jobs = get_feed_jobs(active_countries)
+
+    if due_only:
+        jobs = filter_due_feeds(conn, jobs)
+        print(f"{len(jobs)} feeds due for polling")
+        if not jobs:
+            conn.close()
+            return 0
+
+    if stream is not None:
+        stream.restore(conn)
+
+    started = time.monotonic()
+    writer = ArticleWriter(conn, stream=stream)
+    not_polled = []
+    if concurrent:
+        fetch_news_concurrently(conn, jobs, writer, record_dir=record_dir, not_polled=not_polled)
+    else:
+        feeds_by_country = {}
+        for country, source, url in jobs:
+            feeds_by_country.setdefault(country, {})[source] = url
+        for country, feeds in feeds_by_country.items():
+            fetch_news_for_country(country, conn, writer, feeds=feeds, record_dir=record_dir)
+
+    total_count = writer.close()
+    if stats is not None:
+        stats.update(inserted=writer.inserted, duplicates=writer.duplicates,
+                     skipped=writer.skipped, processed=writer.processed)
+    if stream is not None:
+        stream.save(conn)
+    if record_dir:
+        write_recording_index(record_dir, jobs)
+    # Feeds the deadline kept from being requested stay due for the next poll
+    update_schedule(conn, [job for job in jobs if job not in not_polled])
+    conn.commit()
+    if verbose:
+        print_feed_report(conn)
+        print_schedule(conn)
     conn.close()
-    print(f"\n✓ Total: {total_count} articles collected")
+    print(f"\n✓ Total: {total_count} new articles collected in {time.monotonic() - started:.1f}s")
     return total_count
 
 if __name__ == "__main__":
-    fetch_news()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Collect news from the active countries' RSS feeds")
+    parser.add_argument('--record', metavar='DIR', help='Save raw feed bodies to DIR for offline replay')
+    parser.add_argument('--sequential', action='store_true', help='Fetch feeds one by one')
+    parser.add_argument('--due-only', action='store_true', help='Only poll feeds that are due')
+    parser.add_argument('--verbose', action='store_true', default=None,
+                        help='Print the feed ledger and schedule after a --due-only run too')
+    args = parser.parse_args()
+
+    fetch_news(concurrent=not args.sequential, due_only=args.due_only, record_dir=args.record,
+               verbose=args.verbose)
@@ -0,0 +1,113 @@
+# rollups.py
+"""
+Incrementally maintained aggregates of analyzed articles
+
+article_rollups holds one row per (country, day, topic, scope, source) with
+the number of analyzed articles and the sums of their viral and sentiment
+scores. The analyzer keeps it current as it writes results: before a batch
+is applied the old contributions of its rows (if they were analyzed before)
+are subtracted, afterwards the new ones are added. Summaries and detectors
+that need counts or averages per group read O(groups) rows from here
+instead of scanning articles.
+
+Rows whose analysis is wiped outside the analyzer (e.g. setting topic to
+NULL to force re-analysis) keep their old contribution; init_rollups()
+notices the totals no longer match and rebuilds the table.
+
+Days are UTC day starts as POSIX timestamps (fetched_ts rounded down), the
+same boundaries day_start_ts() in db_utils.py produces, so day-window
+queries over the rollups match the same queries over articles exactly.
+"""
+
+ROLLUP_KEY = 'country, day, topic, scope, source'
+
+# Grouping expressions over articles, in ROLLUP_KEY order (NULLs would never
+# match a primary key on upsert, so they are stored as '' / 0)
+ROLLUP_GROUPS = '''
+    COALESCE(country, ''),
+    COALESCE(fetched_ts, 0) / 86400 * 86400,
+    topic,
+    COALESCE(scope, ''),
+    COALESCE(source, '')
+'''
+
+ANALYZED_CONDITION = 'topic IS NOT NULL AND viral_score IS NOT NULL'
+
+
+def init_rollups(conn):
+    """
+    Create article_rollups, filling it from articles when it is new
+
+    An existing table is checked against articles (total count of analyzed
+    rows) and rebuilt if it has drifted.
+
+    Returns:
+        bool: True if the table was created or rebuilt by this call
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_rollups'"
+    ).fetchone()
+    if exists:
+        rolled_up = conn.execute('SELECT TOTAL(article_count) FROM article_rollups').fetchone()[0]
+        analyzed = conn.execute(f'SELECT COUNT(*) FROM articles WHERE {ANALYZED_CONDITION}').fetchone()[0]
+        if rolled_up == analyzed:
+            return False
+        print(f"  Rollups count {rolled_up:.0f} analyzed articles, articles table has {analyzed}: rebuilding")
+        rebuild_rollups(conn)
+        conn.commit()
+        return True
+
+    conn.execute(f'''
+        CREATE TABLE article_rollups (
+            country TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            topic TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            source TEXT NOT NULL,
+            article_count INTEGER NOT NULL DEFAULT 0,
+            viral_sum REAL NOT NULL DEFAULT 0,
+            sentiment_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY ({ROLLUP_KEY})
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_rollups_day ON article_rollups(day, country)')
+    rebuild_rollups(conn)
+    conn.commit()
+    return True
+
+
+def rebuild_rollups(conn):
+    """Recompute every rollup row from articles (not committed here)"""
+    conn.execute('DELETE FROM article_rollups')
+    conn.execute(f'''
+        INSERT INTO article_rollups ({ROLLUP_KEY}, article_count, viral_sum, sentiment_sum)
+        SELECT {ROLLUP_GROUPS}, COUNT(*), TOTAL(viral_score), TOTAL(sentiment_score)
+        FROM articles
+        WHERE {ANALYZED_CONDITION}
+        GROUP BY {ROLLUP_GROUPS}
+    ''')
+
+
+def apply_rollup_delta(conn, ids_table, sign):
+    """
+    Add (sign=1) or subtract (sign=-1) the current contribution of some articles
+
+    Args:
+        conn: Open SQLite connection
+        ids_table: Table with an id column naming the articles
+        sign: 1 or -1
+    """
+    conn.execute(f'''
+        INSERT INTO article_rollups ({ROLLUP_KEY}, article_count, viral_sum, sentiment_sum)
+        SELECT {ROLLUP_GROUPS}, ? * COUNT(*), ? * TOTAL(viral_score), ? * TOTAL(sentiment_score)
+        FROM articles
+        WHERE id IN (SELECT id FROM {ids_table})
+        AND {ANALYZED_CONDITION}
+        GROUP BY {ROLLUP_GROUPS}
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            article_count = article_count + excluded.article_count,
+            viral_sum = viral_sum + excluded.viral_sum,
+            sentiment_sum = sentiment_sum + excluded.sentiment_sum
+    ''', (sign, sign, sign))
+    if sign < 0:
+        conn.execute('DELETE FROM article_rollups WHERE article_count <= 0')
@@ -0,0 +1,130 @@
+# sentiment_cache.py
+"""
+Persistent cache of sentiment scores keyed by normalized article text
+
+Syndicated copies and re-fetched items carry the same headline and summary,
+so their sentiment only needs computing once. Scores are keyed by a hash of
+the lowercased, whitespace-collapsed, tag-stripped text and kept in an
+in-memory LRU backed by the sentiment_cache table.
+
+The cache lives in the analysis writer process: it annotates each chunk of
+pending rows with the scores it already knows before the chunk is analyzed,
+and learns the new scores from the results.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+
+SENTIMENT_CACHE_SIZE = 50000    # Scores kept in memory
+LOOKUP_BATCH = 500              # Hashes per SQLite IN (...) lookup
+
+TAG_PATTERN = re.compile(r'<[^>]+>')
+SPACE_PATTERN = re.compile(r'\s+')
+
+
+def text_key(headline, summary, backend=''):
+    """Cache key of an article's text (scores of different backends never mix)"""
+    text = TAG_PATTERN.sub(' ', f"{headline} {summary}")
+    normalized = SPACE_PATTERN.sub(' ', text).strip().lower()
+    return hashlib.sha1(f"{backend}:{normalized}".encode()).hexdigest()
+
+
+class SentimentCache:
+    """LRU of text hash -> polarity, backed by a SQLite side table"""
+
+    def __init__(self, conn, backend='', max_entries=SENTIMENT_CACHE_SIZE):
+        self.conn = conn
+        self.backend = backend
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.awaiting = {}      # article id -> hash of rows sent off without a score
+        self.pending = {}       # new scores not yet written to SQLite
+        self.hits = 0
+        self.misses = 0
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                text_hash TEXT PRIMARY KEY,
+                polarity REAL
+            )
+        ''')
+
+    def _remember(self, key, polarity):
+        self.memory[key] = polarity
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, keys):
+        """Fetch stored scores for hashes missing from memory"""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            placeholders = ', '.join('?' * len(batch))
+            found.update(self.conn.execute(
+                f'SELECT text_hash, polarity FROM sentiment_cache WHERE text_hash IN ({placeholders})',
+                batch
+            ).fetchall())
+        return found
+
+    def annotate(self, rows):
+        """
+        Attach cached scores to a chunk of pending rows
+
+        Args:
+            rows: List of (id, headline, summary, country)
+
+        Returns:
+            list: (id, headline, summary, country, text_hash, polarity) with
+                  polarity None where it still has to be computed
+        """
+        keys = [text_key(headline, summary, self.backend) for _, headline, summary, _ in rows]
+        stored = self._load({key for key in keys if key not in self.memory and key not in self.pending})
+
+        annotated = []
+        waiting = set()     # hashes this chunk will compute
+        for (article_id, headline, summary, country), key in zip(rows, keys):
+            if key in self.memory:
+                polarity = self.memory[key]
+                self.memory.move_to_end(key)
+            else:
+                polarity = self.pending.get(key, stored.get(key))
+                if polarity is not None:
+                    self._remember(key, polarity)
+
+            if polarity is not None or key in waiting:
+                # A repeat of an uncached text in the same chunk is a hit too:
+                # the analyzer computes each hash once per chunk
+                self.hits += 1
+            else:
+                self.misses += 1
+                waiting.add(key)
+
+            if polarity is None:
+                self.awaiting[article_id] = key
+            annotated.append((article_id, headline, summary, country, key, polarity))
+        return annotated
+
+    def record(self, results):
+        """Learn the scores of analyzed rows from their _analyze_chunk() result tuples"""
+        for result in results:
+            key = self.awaiting.pop(result[-1], None)
+            if key is not None:
+                polarity = result[2]
+                self.pending[key] = polarity
+                self._remember(key, polarity)
+
+    def flush(self):
+        """Write new scores to the side table (not committed here)"""
+        if self.pending:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO sentiment_cache (text_hash, polarity) VALUES (?, ?)',
+                self.pending.items()
+            )
+            self.pending = {}
+
+    def hit_rate(self):
+        """Share of lookups that skipped TextBlob"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -1,83 +1,400 @@
 # story_detector.py
 import sqlite3
+import pickle
 import pandas as pd
 from datetime import datetime, timedelta
-from collections import Counter
-import re
+from collections import Counter, namedtuple
 import sys
+import time
 import os
 
 # Add parent directory to path for config imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.countries import get_country_config, get_viral_people
+from config.countries import COUNTRIES, get_country_config, get_viral_people
 from config.viral_topics import should_post
-
-class StoryDetector:
-    def __init__(self, country=None, db_path=None):
+from keyword_matcher import get_matcher
+from rollups import init_rollups
+from term_index import init_term_index
+from claims import init_claims
+from db_utils import add_column, day_start_ts
+from fingerprints import analysis_fingerprint, config_digest
+
+DETECTOR_CACHE_VERSION = 1      # Bump when detector logic changes, to drop memoized results
+
+MIN_STORY_SCORE = 5             # Articles below this viral_score are not counted as stories
+MIN_RECORD_SCORE = 10           # Articles considered for records and global stories
+MIN_SENTIMENT_SHIFT = 0.1       # Smallest change in average sentiment reported as a shift
+MIN_POST_SCORE = 5              # Stories below this virality are not posted
+
+DetectorSpec = namedtuple('DetectorSpec', ['name', 'window_days'])
+DETECTORS = []                  # Registered StoryDetector methods, in run order
+
+def detector(window_days):
+    """
+    Register a StoryDetector method as a story detector
+
+    Args:
+        window_days: Days of articles the detector reads; its memoized result
+                     is reused while nothing in that window changes
+    """
+    def register(method):
+        DETECTORS.append(DetectorSpec(method.__name__, window_days))
+        return method
+    return register
+
+def detector_fingerprint():
+    """
+    Fingerprint of the config detector results depend on besides article rows
+
+    Covers the tracked people, the country names and flags used in
+    headlines, the thresholds above and analysis_fingerprint(). It is part
+    of every watermark, so memoized results are dropped after a config edit.
+
+    Returns:
+        str: Short hex digest
+    """
+    return config_digest({
+        'version': DETECTOR_CACHE_VERSION,
+        'analysis': analysis_fingerprint(),
+        'countries': {
+            country: {key: settings.get(key) for key in ('name', 'flag', 'politicians')}
+            for country, settings in COUNTRIES.items()
+        },
+        'viral_people': get_viral_people(),
+        'thresholds': [MIN_STORY_SCORE, MIN_RECORD_SCORE, MIN_SENTIMENT_SHIFT, MIN_POST_SCORE],
+    })
+
+class DetectorContext:
+    """
+    Weekly aggregates shared by the StoryDetectors of one run
+
+    Surge and sentiment detection compare this week with last week by topic.
+    Run per detector, that is two range scans per country plus two for the
+    global detector. The context reads each window once for all countries,
+    grouped by country and topic, and hands every detector its slice (or the
+    all-country total), so detection cost stays flat as countries are added.
+
+    Detectors read all their article windows through the context, and every
+    window ends at the midnight after `now`, so a context for a past `now`
+    sees what a run on that day would have seen (see backtest.py).
+    """
+
+    def __init__(self, db_path=None, now=None):
         """
-        Initialize story detector
-
         Args:
-            country: 'UK', 'US', or None for global stories
             db_path: Path to database
+            now: Time the weekly windows are relative to (default: now)
         """
-        self.country = country
         if db_path is None:
             db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tagtaly.db')
         self.conn = sqlite3.connect(db_path)
-        self.config = get_country_config(country) if country else None
+        init_rollups(self.conn)
+        init_term_index(self.conn)
+        init_claims(self.conn)
+        add_column(self.conn, 'articles', 'analysis_version', 'TEXT')
+        # Detector watermarks are read from these alone
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_fetched_version ON articles(fetched_ts, analysis_version)')
+        self.conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_country_fetched_version ON articles(country, fetched_ts, analysis_version)'
+        )
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS detector_runs (
+                detector TEXT NOT NULL,
+                country TEXT NOT NULL,
+                watermark TEXT,
+                wall_seconds REAL,
+                rows_scanned INTEGER,
+                result_size INTEGER,
+                cached INTEGER,
+                ran_at TEXT,
+                result BLOB,
+                PRIMARY KEY (detector, country)
+            )
+        ''')
+        self.conn.commit()
+        self.now = time.time() if now is None else now
+        self.until = day_start_ts(-1, self.now)     # Windows end at the midnight after now
+        self._stories = None
+        self._sentiment = None
+        self._watermarks = {}
+        self.fingerprint = detector_fingerprint()
+
+    def window_starts(self):
+        """(this week start, last week start, last week end) as fetched_ts bounds"""
+        return (day_start_ts(7, self.now), day_start_ts(14, self.now), day_start_ts(6, self.now))
+
+    def _load_stories(self):
+        """
+        One row per distinct story per country and topic in the last two weeks
 
-    def find_viral_angles(self):
-        """Detect the most shareable story angles, filtered by viral score"""
-        stories = []
+        Counts are of distinct stories, which do not add up across countries
+        (a cluster can span them), so stories are kept until sliced.
+        """
+        if self._stories is None:
+            this_week, last_week, last_week_end = self.window_starts()
+            self._stories = pd.read_sql_query('''
+                SELECT
+                    country,
+                    topic,
+                    COALESCE(cluster_id, id) as story,
+                    MAX(fetched_ts >= ? AND viral_score >= ?) as in_this_week,
+                    MAX(fetched_ts < ?) as in_last_week
+                FROM articles
+                WHERE fetched_ts >= ? AND fetched_ts < ?
+                GROUP BY country, topic, story
+            ''', self.conn, params=[this_week, MIN_STORY_SCORE, last_week_end, last_week, self.until])
+        return self._stories
+
+    def _load_sentiment(self):
+        """Sentiment sums per country, topic and day of the last two weeks (from the rollups)"""
+        if self._sentiment is None:
+            _, last_week, _ = self.window_starts()
+            self._sentiment = pd.read_sql_query('''
+                SELECT country, topic, day, SUM(sentiment_sum) as sentiment_sum, SUM(article_count) as count
+                FROM article_rollups
+                WHERE day >= ? AND day < ?
+                GROUP BY country, topic, day
+            ''', self.conn, params=[last_week, self.until])
+        return self._sentiment
+
+    def watermark(self, country, window_days):
+        """
+        State of the articles a detector window reads
 
-        # 1. SURGE DETECTION - What exploded this week?
-        stories.append(self.detect_topic_surge())
+        Covers the detector config (detector_fingerprint()), the window
+        start, and per analysis_version the number of
+        articles and the newest fetched_ts. New articles, newly analyzed ones
+        (analysis stamps the version) and re-analysis all change it, and it
+        is answered from an index without reading article rows.
 
-        # 2. POLITICIAN/CELEBRITY SCORECARD - Who's dominating the news?
-        stories.append(self.track_viral_people_mentions())
+        Returns:
+            tuple: (watermark string, articles in the window)
+        """
+        key = (country, window_days)
+        if key not in self._watermarks:
+            since = day_start_ts(window_days, self.now)
+            country_filter, params = ("AND country = ?", [country]) if country else ("", [])
+            rows = self.conn.execute(f'''
+                SELECT analysis_version, COUNT(*), MAX(fetched_ts)
+                FROM articles
+                WHERE fetched_ts >= ? AND fetched_ts < ?
+                {country_filter}
+                GROUP BY analysis_version
+                ORDER BY analysis_version
+            ''', [since, self.until] + params).fetchall()
+            watermark = repr((self.fingerprint, since, rows))
+            self._watermarks[key] = (watermark, sum(row[1] for row in rows))
+        return self._watermarks[key]
+
+    def topic_story_counts(self, country=None):
+        """
+        Distinct stories per topic this week (viral_score >= MIN_STORY_SCORE) and last week
 
-        # 3. SENTIMENT SHIFT - Mood change detection
-        stories.append(self.detect_sentiment_shift())
+        Args:
+            country: Country code, or None for all countries
 
-        # 4. RECORD BREAKING - New highs/lows
-        stories.append(self.find_record_numbers())
+        Returns:
+            tuple: (this_week, last_week) DataFrames with topic and count columns
+        """
+        stories = self._load_stories()
+        if country:
+            stories = stories[stories['country'] == country]
 
-        # 5. MEDIA BIAS TRACKER - Who covers what?
-        stories.append(self.compare_outlet_focus())
+        def count(flag):
+            window = stories[stories[flag] == 1]
+            return window.groupby('topic', dropna=False)['story'].nunique().reset_index(name='count')
 
-        # Filter by viral score (must be >= 5)
-        filtered_stories = [s for s in stories if s.get('virality_score', 0) >= 5]
+        return count('in_this_week'), count('in_last_week')
 
-        # Sort by viral score
-        filtered_stories.sort(key=lambda x: x.get('virality_score', 0), reverse=True)
+    def topic_sentiment(self, country=None):
+        """
+        Average sentiment per topic this week and last week
 
-        return filtered_stories
+        Args:
+            country: Country code, or None for all countries
 
-    def detect_topic_surge(self):
-        """Find topics that suddenly exploded in coverage"""
+        Returns:
+            tuple: (this_week, last_week) DataFrames with topic and avg_sentiment columns
+        """
+        sentiment = self._load_sentiment()
+        if country:
+            sentiment = sentiment[sentiment['country'] == country]
+        this_week, _, last_week_end = self.window_starts()
 
-        # Build country filter
-        country_filter = f"AND country = '{self.country}'" if self.country else ""
+        def average(window):
+            totals = window.groupby('topic')[['sentiment_sum', 'count']].sum()
+            return (totals['sentiment_sum'] / totals['count']).reset_index(name='avg_sentiment')
+
+        return (average(sentiment[sentiment['day'] >= this_week]),
+                average(sentiment[sentiment['day'] < last_week_end]))
+
+    def people_story_counts(self, country, aliases):
+        """
+        Distinct stories (viral_score >= MIN_STORY_SCORE) mentioning each person this week
 
-        # Compare this week vs last week
-        this_week = pd.read_sql_query(f'''
-            SELECT topic, COUNT(*) as count
+        Args:
+            country: Country code, or None for all countries
+            aliases: (keyword, name) pairs, each person's keyword_matcher keywords
+
+        Returns:
+            dict: name -> stories, for the people mentioned at all
+        """
+        country_filter, params = ("AND country = ?", [country]) if country else ("", [])
+        values = ', '.join('(?, ?)' for _ in aliases)
+
+        # Count distinct stories so syndicated copies don't inflate a person's
+        # score. CROSS JOIN keeps the order alias -> postings (a term + window
+        # range scan) -> article, rather than walking the country's history.
+        rows = self.conn.execute(f'''
+            WITH aliases(term, name) AS (VALUES {values})
+            SELECT aliases.name, COUNT(DISTINCT COALESCE(cluster_id, id)) as stories
+            FROM aliases
+            CROSS JOIN article_terms AS t ON t.term = aliases.term AND t.fetched_ts >= ? AND t.fetched_ts < ?
+            CROSS JOIN articles ON articles.id = t.article_id
+            WHERE viral_score >= ?
+            {country_filter}
+            GROUP BY aliases.name
+        ''', [value for alias in aliases for value in alias]
+            + [day_start_ts(7, self.now), self.until, MIN_STORY_SCORE] + params).fetchall()
+        return dict(rows)
+
+    def record_articles(self, country):
+        """
+        Articles of the last two days with viral_score >= MIN_RECORD_SCORE and a record claim
+
+        Args:
+            country: Country code, or None for all countries
+
+        Returns:
+            list: (headline, summary, source, viral_score, big_number) tuples
+                  in fetch order, big_number being the first number of the headline
+        """
+        country_filter, params = ("AND country = ?", [country]) if country else ("", [])
+        return self.conn.execute(f'''
+            SELECT
+                headline,
+                summary,
+                source,
+                viral_score,
+                (SELECT text FROM claims AS n
+                 WHERE n.article_id = articles.id AND n.kind = 'number' AND n.in_headline
+                 ORDER BY n.span_start LIMIT 1) as big_number
             FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-7 days')
-            AND viral_score >= 5
+            WHERE fetched_ts >= ? AND fetched_ts < ?
+            AND viral_score >= ?
             {country_filter}
-            GROUP BY topic
-        ''', self.conn)
+            AND EXISTS (
+                SELECT 1 FROM claims AS c
+                WHERE c.article_id = articles.id AND c.kind IN ('count', 'percent', 'record')
+            )
+            ORDER BY fetched_ts, id
+        ''', [day_start_ts(2, self.now), self.until, MIN_RECORD_SCORE] + params).fetchall()
+
+    def outlet_topic_counts(self, country):
+        """
+        Articles (viral_score >= MIN_STORY_SCORE) per source and topic this week
+
+        Args:
+            country: Country code, or None for all countries
 
-        last_week = pd.read_sql_query(f'''
-            SELECT topic, COUNT(*) as count
+        Returns:
+            DataFrame: source, topic and count columns
+        """
+        country_filter, params = ("AND country = ?", [country]) if country else ("", [])
+        return pd.read_sql_query(f'''
+            SELECT source, topic, COUNT(*) as count
             FROM articles
-            WHERE DATE(fetched_at) BETWEEN DATE('now', '-14 days') AND DATE('now', '-7 days')
+            WHERE fetched_ts >= ? AND fetched_ts < ?
+            AND viral_score >= ?
             {country_filter}
-            GROUP BY topic
-        ''', self.conn)
+            GROUP BY source, topic
+            ORDER BY source, topic
+        ''', self.conn, params=[day_start_ts(7, self.now), self.until, MIN_STORY_SCORE] + params)
+
+class StoryDetector:
+    def __init__(self, country=None, db_path=None, context=None):
+        """
+        Initialize story detector
+
+        Args:
+            country: 'UK', 'US', or None for global stories
+            db_path: Path to database
+            context: DetectorContext shared with the run's other detectors
+                     (a private one is made when omitted)
+        """
+        self.country = country
+        self.context = context or DetectorContext(db_path)
+        self.conn = self.context.conn
+        self.config = get_country_config(country) if country else None
+
+    def find_viral_angles(self):
+        """Detect the most shareable story angles, filtered by viral score"""
+        stories = [self.run_detector(spec) for spec in DETECTORS]
+
+        # Filter by viral score (must be >= MIN_POST_SCORE)
+        filtered_stories = [s for s in stories if s.get('virality_score', 0) >= MIN_POST_SCORE]
+
+        # Sort by viral score
+        filtered_stories.sort(key=lambda x: x.get('virality_score', 0), reverse=True)
+
+        return filtered_stories
+
+    def run_detector(self, spec):
+        """
+        Run one registered detector, or reuse its memoized result
+
+        The result is stored with the watermark of the detector's window and
+        returned as-is while the watermark is unchanged. Every run records
+        wall time, articles in the window and result size in detector_runs.
+
+        Returns:
+            dict: The detector's story
+        """
+        country = self.country or ''
+        started = time.perf_counter()
+        watermark, rows_scanned = self.context.watermark(self.country, spec.window_days)
+
+        stored = self.conn.execute(
+            'SELECT watermark, result FROM detector_runs WHERE detector = ? AND country = ?',
+            (spec.name, country)
+        ).fetchone()
+        cached = stored is not None and stored[0] == watermark and stored[1] is not None
+        if cached:
+            try:
+                story = pickle.loads(stored[1])
+            except Exception:
+                # Pickled by another pandas or Python version: recompute
+                cached = False
+        if not cached:
+            story = getattr(self, spec.name)()
+
+        data = story.get('data')
+        result_size = len(data) if hasattr(data, '__len__') else int(data is not None)
+        elapsed = time.perf_counter() - started
+        self.conn.execute('''
+            INSERT OR REPLACE INTO detector_runs
+            (detector, country, watermark, wall_seconds, rows_scanned, result_size, cached, ran_at, result)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (spec.name, country, watermark, elapsed, rows_scanned, result_size, int(cached),
+              datetime.now().isoformat(), stored[1] if cached else pickle.dumps(story)))
+        self.conn.commit()
+
+        label = 'cached' if cached else f"{rows_scanned} rows"
+        print(f"   ⏱️  {spec.name}: {elapsed * 1000:.1f} ms ({label}, {result_size} results)")
+        return story
+
+    @detector(window_days=14)
+    def detect_topic_surge(self):
+        """
+        Find topics that suddenly exploded in coverage
+
+        Counts are of distinct stories (near-duplicate clusters), so one wire
+        story syndicated by several outlets counts once.
+        """
+
+        # Compare this week vs last week (shared pass, see DetectorContext)
+        this_week, last_week = self.context.topic_story_counts(self.country)
 
         if len(this_week) == 0 or len(last_week) == 0:
             return {'type': 'SURGE_ALERT', 'data': None, 'virality_score': 0}
@@ -101,42 +418,38 @@ class StoryDetector:
             'country': self.country
         }
 
+    @detector(window_days=7)
     def track_viral_people_mentions(self):
-        """Count mentions of viral people (politicians, tech CEOs, celebrities, etc.)"""
+        """
+        Count mentions of viral people (politicians, tech CEOs, celebrities, etc.)
 
-        # Get country-specific politicians
+        Mentions are looked up in the stored keyword postings (term_index.py)
+        rather than by re-scanning the week's article text: one query counts
+        the distinct stories of every person's keywords at once.
+        """
+
+        # Get country-specific politicians, as keyword_matcher tags
         people_to_track = {}
 
         if self.country and self.config:
-            people_to_track.update(self.config.get('politicians', {}))
+            for name in self.config.get('politicians', {}):
+                people_to_track[name] = ('politician', self.country.upper(), name)
 
         # Add global viral people
         viral_people = get_viral_people()
         for category, people in viral_people.items():
-            people_to_track.update(people)
-
-        country_filter = f"AND country = '{self.country}'" if self.country else ""
+            for name in people:
+                people_to_track[name] = ('person', name)
 
-        df = pd.read_sql_query(f'''
-            SELECT headline, summary, fetched_at
-            FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-7 days')
-            AND viral_score >= 5
-            {country_filter}
-        ''', self.conn)
+        # (keyword, name) pairs: each person's aliases
+        matcher = get_matcher()
+        aliases = [(keyword, name) for name, tag in people_to_track.items() for keyword in matcher.keywords_of(tag)]
 
-        if len(df) == 0:
+        if not aliases:
             return {'type': 'VIRAL_PEOPLE_SCORECARD', 'data': None, 'virality_score': 0}
 
-        mention_counts = {}
-        for name, keywords in people_to_track.items():
-            count = 0
-            for _, row in df.iterrows():
-                text = f"{row['headline']} {row['summary']}".lower()
-                if any(keyword.lower() in text for keyword in keywords):
-                    count += 1
-            if count > 0:
-                mention_counts[name] = count
+        found = self.context.people_story_counts(self.country, aliases)
+        mention_counts = {name: found[name] for name in people_to_track if name in found}
 
         if len(mention_counts) < 2:
             return {'type': 'VIRAL_PEOPLE_SCORECARD', 'data': None, 'virality_score': 0}
@@ -158,29 +471,14 @@ class StoryDetector:
             'country': self.country
         }
 
+    @detector(window_days=14)
     def detect_sentiment_shift(self):
         """Detect major mood changes in news coverage"""
 
-        country_filter = f"AND country = '{self.country}'" if self.country else ""
-
-        # Compare sentiment this week vs last week by topic
-        this_week = pd.read_sql_query(f'''
-            SELECT topic, AVG(sentiment_score) as avg_sentiment
-            FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-7 days')
-            AND sentiment_score IS NOT NULL
-            {country_filter}
-            GROUP BY topic
-        ''', self.conn)
-
-        last_week = pd.read_sql_query(f'''
-            SELECT topic, AVG(sentiment_score) as avg_sentiment
-            FROM articles
-            WHERE DATE(fetched_at) BETWEEN DATE('now', '-14 days') AND DATE('now', '-7 days')
-            AND sentiment_score IS NOT NULL
-            {country_filter}
-            GROUP BY topic
-        ''', self.conn)
+        # Compare sentiment this week vs last week by topic (from the daily
+        # rollups via the shared pass; the windows start at midnight, so
+        # they cover whole days)
+        this_week, last_week = self.context.topic_sentiment(self.country)
 
         if len(this_week) == 0 or len(last_week) == 0:
             return {'type': 'SENTIMENT_SHIFT', 'data': None, 'virality_score': 0}
@@ -192,7 +490,7 @@ class StoryDetector:
         merged['abs_change'] = abs(merged['sentiment_change'])
         top_shift = merged.nlargest(1, 'abs_change').iloc[0]
 
-        if abs(top_shift['sentiment_change']) < 0.1:
+        if abs(top_shift['sentiment_change']) < MIN_SENTIMENT_SHIFT:
             return {'type': 'SENTIMENT_SHIFT', 'data': None, 'virality_score': 0}
 
         direction = "more negative" if top_shift['sentiment_change'] < 0 else "more positive"
@@ -207,44 +505,29 @@ class StoryDetector:
             'country': self.country
         }
 
+    @detector(window_days=2)
     def find_record_numbers(self):
-        """Extract numeric claims and flag records"""
-
-        country_filter = f"AND country = '{self.country}'" if self.country else ""
-
-        df = pd.read_sql_query(f'''
-            SELECT headline, summary, source, fetched_at, viral_score
-            FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-2 days')
-            AND viral_score >= 10
-            {country_filter}
-        ''', self.conn)
+        """
+        Flag records among recent high-scoring articles
 
-        if len(df) == 0:
-            return {'type': 'RECORD_ALERT', 'data': None, 'virality_score': 0}
+        Record claims (big counts, percentage moves, highs and lows) were
+        extracted at ingest (claims.py), so this is an indexed lookup; each
+        record carries the first number of its headline for the chart.
+        """
 
-        # Pattern matching for impactful numbers
-        record_patterns = [
-            r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(million|billion|thousand)?\s*(?:people|deaths|jobs|homes)',
-            r'highest\s+(?:in|since)',
-            r'lowest\s+(?:in|since)',
-            r'record\s+(?:high|low)',
-            r'(\d+)%\s+(?:increase|decrease|rise|fall)'
+        rows = self.context.record_articles(self.country)
+
+        records = [
+            {
+                'headline': headline,
+                'source': source,
+                'viral_score': viral_score,
+                'text_snippet': f"{headline} {summary}"[:200],
+                'big_number': big_number
+            }
+            for headline, summary, source, viral_score, big_number in rows
         ]
 
-        records = []
-        for _, row in df.iterrows():
-            text = f"{row['headline']} {row['summary']}"
-            for pattern in record_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    records.append({
-                        'headline': row['headline'],
-                        'source': row['source'],
-                        'viral_score': row['viral_score'],
-                        'text_snippet': text[:200]
-                    })
-                    break
-
         if len(records) == 0:
             return {'type': 'RECORD_ALERT', 'data': None, 'virality_score': 0}
 
@@ -259,19 +542,11 @@ class StoryDetector:
             'country': self.country
         }
 
+    @detector(window_days=7)
     def compare_outlet_focus(self):
         """What's each outlet obsessed with?"""
 
-        country_filter = f"AND country = '{self.country}'" if self.country else ""
-
-        df = pd.read_sql_query(f'''
-            SELECT source, topic, COUNT(*) as count
-            FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-7 days')
-            AND viral_score >= 5
-            {country_filter}
-            GROUP BY source, topic
-        ''', self.conn)
+        df = self.context.outlet_topic_counts(self.country)
 
         if len(df) == 0:
             return {'type': 'MEDIA_BIAS', 'data': None, 'virality_score': 0}
@@ -300,13 +575,13 @@ class StoryDetector:
         df = pd.read_sql_query('''
             SELECT topic, COUNT(DISTINCT country) as country_count, COUNT(*) as total_count
             FROM articles
-            WHERE DATE(fetched_at) >= DATE('now', '-7 days')
+            WHERE fetched_ts >= ? AND fetched_ts < ?
             AND scope = 'GLOBAL'
-            AND viral_score >= 10
+            AND viral_score >= ?
             GROUP BY topic
             HAVING country_count >= 2
             ORDER BY total_count DESC
-        ''', self.conn)
+        ''', self.conn, params=[day_start_ts(7, self.context.now), self.context.until, MIN_RECORD_SCORE])
 
         if len(df) == 0:
             return []
@@ -0,0 +1,297 @@
+# surge_stream.py
+"""
+Streaming topic surge detection for near-real-time alerts
+
+detect_topic_surge compares calendar weeks once a day. SurgeStream instead
+watches articles as the collector stores them: each new story is classified
+on the spot (topic_classifier.py) and counted in an hourly ring buffer per
+(country, topic). Completed hours are folded into an exponentially weighted
+mean and variance of the hourly rate, and when the current hour's count is
+Z_THRESHOLD standard deviations above that baseline a SURGE_ALERT story is
+emitted. Baselines that started from nothing are bias-corrected and stay
+silent for their first WARMUP_HOURS. Observing an article is O(1); hour
+roll-overs cost one step per elapsed hour. Stories are counted in the hour
+they were published (see story_ts()), so a slow feed's or a backlog's
+stories do not pile up in the hour they were polled.
+
+The state is checkpointed to the surge_state table after every collection
+run, so a restarted scheduler picks up where it stopped. On a cold start
+the baselines are seeded from the stored articles instead, counting the
+same thing observe() does: one story per cluster and country, on the day
+it appeared there.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.countries import get_country_config
+from near_duplicates import CLUSTER_WINDOW_DAYS
+from topic_classifier import get_classifier
+
+RING_HOURS = 48                 # Hourly counts kept per (country, topic)
+HALF_LIFE_HOURS = 72            # Half-life of the EWMA baseline
+Z_THRESHOLD = 4.0               # Standard deviations above baseline that make a surge
+MIN_SURGE_COUNT = 5             # Stories in the hour before an alert can fire
+VARIANCE_FLOOR = 1.0            # Keeps near-silent topics from alerting on a couple of stories
+SEED_DAYS = 28                  # Days of stored stories used to seed baselines on a cold start
+MAX_CATCH_UP_HOURS = 24 * 14    # Longer gaps decay the baseline no further
+WARMUP_HOURS = 24               # Hours of history a topic needs before it can alert
+
+ALPHA = 1 - 0.5 ** (1 / HALF_LIFE_HOURS)
+
+# When a story happened: its publish time, clamped to the ring buffer's span
+# before the poll that found it (feeds backdate, slow feeds are polled hours
+# apart), or the poll time when the feed gives none. story_ts() in SQL.
+STORY_TS_SQL = f'''
+    MIN(MAX(COALESCE(published_ts, fetched_ts), fetched_ts - {(RING_HOURS - 1) * 3600}), fetched_ts)
+'''
+
+
+def story_ts(published_ts, fetched_ts):
+    """POSIX time a story is counted at (see STORY_TS_SQL)"""
+    if published_ts is None:
+        return fetched_ts
+    return min(max(published_ts, fetched_ts - (RING_HOURS - 1) * 3600), fetched_ts)
+
+
+class TopicRate:
+    """Hourly counts and EWMA baseline of one (country, topic)"""
+
+    __slots__ = ('hour', 'ring', 'mean', 'var', 'hours', 'alerted_hour')
+
+    def __init__(self, hour, mean=0.0, var=0.0, hours=0, ring=None, alerted_hour=None):
+        self.hour = hour                # Hour (POSIX seconds // 3600) the newest slot belongs to
+        self.ring = ring if ring and len(ring) == RING_HOURS else [0] * RING_HOURS
+        self.mean = mean
+        self.var = var
+        self.hours = hours              # Completed hours folded into the baseline
+        self.alerted_hour = alerted_hour
+
+    @classmethod
+    def seeded(cls, hour, mean, var, hours):
+        """
+        Rate whose baseline() is `mean` and `var`, as if `hours` hours had been folded
+
+        The stored EWMA is scaled down by the bias-correction weight, so the
+        correction baseline() applies to young rates gives the seed back.
+        """
+        weight = 1 - (1 - ALPHA) ** hours
+        return cls(hour, mean * weight, var * weight, hours)
+
+    def advance(self, hour):
+        """Fold every completed hour up to `hour` into the baseline"""
+        elapsed = hour - self.hour
+        if elapsed <= 0:
+            return
+        # The newest slot's count, then one empty hour per hour without stories
+        count = self.ring[self.hour % RING_HOURS]
+        for _ in range(min(elapsed, MAX_CATCH_UP_HOURS)):
+            diff = count - self.mean
+            self.mean += ALPHA * diff
+            self.var = (1 - ALPHA) * (self.var + ALPHA * diff * diff)
+            self.hours += 1
+            count = 0
+        for step in range(1, min(elapsed, RING_HOURS) + 1):
+            self.ring[(self.hour + step) % RING_HOURS] = 0
+        self.hour = hour
+
+    def count(self, hours=1):
+        """Stories in the newest `hours` hourly slots"""
+        return sum(self.ring[(self.hour - step) % RING_HOURS] for step in range(min(hours, RING_HOURS)))
+
+    def baseline(self):
+        """
+        Bias-corrected (mean, variance) of the hourly count
+
+        A baseline that started at zero underestimates the rate until its
+        weights add up; dividing by their sum removes that.
+        """
+        weight = 1 - (1 - ALPHA) ** self.hours
+        if weight <= 0:
+            return 0.0, 0.0
+        return self.mean / weight, self.var / weight
+
+    def z_score(self):
+        """How unusual the current hour's count is against the baseline"""
+        mean, var = self.baseline()
+        return (self.count() - mean) / math.sqrt(var + VARIANCE_FLOOR)
+
+
+class SurgeStream:
+    """In-memory surge detector fed one new story at a time"""
+
+    def __init__(self):
+        self.rates = {}         # (country, topic) -> TopicRate
+        self.alerts = []        # SURGE_ALERT stories not yet drained
+        self.restored = False
+
+    def observe(self, country, topic, ts):
+        """
+        Count one new story
+
+        Args:
+            country: Country code
+            topic: Topic assigned to the story
+            ts: POSIX time the story happened (see story_ts())
+
+        Returns:
+            dict: SURGE_ALERT story if this story pushed the topic over the threshold, else None
+        """
+        hour = int(ts // 3600)
+        rate = self.rates.get((country, topic))
+        if rate is None:
+            rate = self.rates[(country, topic)] = TopicRate(hour)
+        rate.advance(hour)
+        if hour < rate.hour:
+            # Older than the newest hour seen (a feed polled late): kept in
+            # its own hour's slot rather than inflating the current one
+            if rate.hour - hour < RING_HOURS:
+                rate.ring[hour % RING_HOURS] += 1
+            return None
+        rate.ring[rate.hour % RING_HOURS] += 1
+
+        count = rate.count()
+        if count < MIN_SURGE_COUNT or rate.hours < WARMUP_HOURS or rate.alerted_hour == rate.hour:
+            return None
+        z_score = rate.z_score()
+        if z_score < Z_THRESHOLD:
+            return None
+
+        rate.alerted_hour = rate.hour
+        story = self._alert(country, topic, rate, z_score)
+        self.alerts.append(story)
+        return story
+
+    def observe_article(self, country, headline, summary, published_ts, fetched_ts):
+        """Classify a newly stored article and count it at its story_ts() (see observe())"""
+        topic = get_classifier(country).classify(f"{headline} {summary}").topic
+        return self.observe(country, topic, story_ts(published_ts, fetched_ts))
+
+    def drain_alerts(self):
+        """SURGE_ALERT stories emitted since the last call"""
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+    def _alert(self, country, topic, rate, z_score):
+        count = rate.count()
+        mean, _ = rate.baseline()
+        pct_change = (count - mean) / max(mean, 1.0) * 100
+        config = get_country_config(country)
+        flag = config['flag'] if config else '🌍'
+        return {
+            'type': 'SURGE_ALERT',
+            'headline': f"{flag} {topic} news UP {pct_change:.0f}% this hour",
+            'viz_type': 'comparison_bars',
+            'data': pd.DataFrame([{
+                'topic': topic,
+                'count_now': count,
+                'count_before': mean,
+                'pct_change': pct_change,
+                'z_score': z_score,
+                'count_24h': rate.count(24)
+            }]),
+            'virality_score': min(abs(pct_change) / 10, 20),
+            'country': country
+        }
+
+    def restore(self, conn):
+        """
+        Load the last checkpoint, or seed baselines from stored stories on a cold start
+
+        A checkpoint older than the ring buffer is ignored too: its hourly
+        history is gone, and catching up would decay every baseline to zero.
+        Only the first call does anything, so it can be made before every run.
+        """
+        if self.restored:
+            return
+        self.restored = True
+        init_surge_state(conn)
+        now = time.time()
+
+        rows = conn.execute(
+            'SELECT country, topic, hour, mean, var, hours, alerted_hour, ring FROM surge_state'
+        ).fetchall()
+        if rows and max(row[2] for row in rows) >= now // 3600 - RING_HOURS:
+            for country, topic, hour, mean, var, hours, alerted_hour, ring in rows:
+                self.rates[(country, topic)] = TopicRate(hour, mean, var, hours, json.loads(ring), alerted_hour)
+            print(f"  Surge stream restored: {len(rows)} topic rates")
+            return
+
+        # Daily story counts -> hourly baseline. A cluster is counted once per
+        # country, at its first article there, as the collector feeds only
+        # those to observe(); syndicated copies would inflate the baseline and
+        # mute alerts. The variance of an hour is at least its mean (counts
+        # are roughly Poisson), more if whole days vary a lot.
+        # Days are of story_ts(), the time observe() counts stories at; the
+        # fetched_ts range (indexed) covers every row that can fall in them,
+        # plus a clustering window before it so a cluster that started
+        # earlier is not counted again at a later copy.
+        today = int(now // 86400) * 86400
+        since = today - SEED_DAYS * 86400
+        daily = pd.read_sql_query(f'''
+            SELECT country, topic, ts / 86400 * 86400 as day, COUNT(*) as count
+            FROM (
+                SELECT country, topic, MIN({STORY_TS_SQL}) as ts
+                FROM articles
+                WHERE fetched_ts >= ? AND fetched_ts < ?
+                GROUP BY country, COALESCE(cluster_id, id)
+            )
+            WHERE ts >= ? AND ts < ? AND topic IS NOT NULL
+            GROUP BY country, topic, day
+        ''', conn, params=[since - CLUSTER_WINDOW_DAYS * 86400, today + RING_HOURS * 3600, since, today])
+        if daily.empty:
+            return
+        days = daily['day'].nunique()
+        hour = int(now // 3600)
+        for (country, topic), group in daily.groupby(['country', 'topic']):
+            counts = group['count'].tolist() + [0] * (days - len(group))
+            mean = sum(counts) / days / 24
+            daily_var = sum((c / 24 - mean) ** 2 for c in counts) / days
+            self.rates[(country, topic)] = TopicRate.seeded(hour, mean, max(daily_var * 24, mean), days * 24)
+        print(f"  Surge stream seeded from {days} days of stories: {len(self.rates)} topic rates")
+
+    def save(self, conn):
+        """Checkpoint every rate to surge_state, replacing the last checkpoint (not committed here)"""
+        init_surge_state(conn)
+        conn.execute('DELETE FROM surge_state')
+        conn.executemany('''
+            INSERT OR REPLACE INTO surge_state (country, topic, hour, mean, var, hours, alerted_hour, ring)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (country, topic, rate.hour, rate.mean, rate.var, rate.hours, rate.alerted_hour, json.dumps(rate.ring))
+            for (country, topic), rate in self.rates.items()
+        ])
+
+
+def init_surge_state(conn):
+    """Create the surge_state checkpoint table if it does not exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS surge_state (
+            country TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            hour INTEGER,
+            mean REAL,
+            var REAL,
+            hours INTEGER,
+            alerted_hour INTEGER,
+            ring TEXT,
+            PRIMARY KEY (country, topic)
+        )
+    ''')
+
+
+if __name__ == "__main__":
+    # Self-check: a seeded baseline reads back as the seeded rate at any history length
+    for days in (1, 2, 7, 28):
+        rate = TopicRate.seeded(0, 2.0, 3.0, days * 24)
+        mean, var = rate.baseline()
+        assert abs(mean - 2.0) < 1e-9 and abs(var - 3.0) < 1e-9, (days, mean, var)
+    print("✓ Seeded baselines match the seeded rate")
@@ -0,0 +1,117 @@
+# term_index.py
+"""
+Stored keyword postings of analyzed articles
+
+The analyzer already finds every configured keyword in an article's
+headline + summary in one pass (keyword_matcher.py). Those matches are kept
+in article_terms as term -> article postings, with the article's fetched_ts
+so a window is part of the index lookup, and a flag telling whether the
+keyword occurred as a whole word. Later stages ask "which articles mention
+X since T" with an index range scan instead of re-reading and re-scanning
+article text.
+
+Terms are the lowercased configured keywords (topics, politicians, viral
+people, viral signals). Postings are rewritten whenever an article is
+re-analyzed, so they follow taxonomy edits the same way topics do.
+"""
+
+import os
+import sys
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import get_matcher
+
+BACKFILL_CHUNK_SIZE = 2000      # Articles indexed per batch when the table is first built
+
+
+def init_term_index(conn):
+    """
+    Create article_terms, indexing already analyzed articles when it is new
+
+    Returns:
+        bool: True if the table was created (and built) by this call
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_terms'"
+    ).fetchone()
+    if exists:
+        return False
+
+    conn.execute('''
+        CREATE TABLE article_terms (
+            term TEXT NOT NULL,
+            fetched_ts INTEGER NOT NULL,
+            article_id TEXT NOT NULL,
+            whole_word INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (term, fetched_ts, article_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_terms_article ON article_terms(article_id)')
+
+    matcher = get_matcher()
+    indexed = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute('''
+            SELECT rowid, id, headline, summary
+            FROM articles
+            WHERE rowid > ?
+            AND topic IS NOT NULL
+            ORDER BY rowid
+            LIMIT ?
+        ''', (last_rowid, BACKFILL_CHUNK_SIZE)).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        postings = [
+            (article_id, term, int(whole_word))
+            for _, article_id, headline, summary in rows
+            for term, whole_word in matcher.matches(f"{headline} {summary}").items()
+        ]
+        insert_postings(conn, postings)
+        indexed += len(rows)
+
+    conn.commit()
+    if indexed:
+        print(f"  Indexed keyword terms of {indexed} analyzed articles")
+    return True
+
+
+def insert_postings(conn, postings):
+    """
+    Add postings, taking fetched_ts from the articles (not committed here)
+
+    Args:
+        conn: Open SQLite connection
+        postings: (article_id, term, whole_word) tuples
+    """
+    conn.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS staged_terms (
+            article_id TEXT,
+            term TEXT,
+            whole_word INTEGER
+        )
+    ''')
+    conn.execute('DELETE FROM staged_terms')
+    conn.executemany('INSERT INTO staged_terms (article_id, term, whole_word) VALUES (?, ?, ?)', postings)
+    conn.execute('''
+        INSERT OR REPLACE INTO article_terms (term, fetched_ts, article_id, whole_word)
+        SELECT t.term, COALESCE(a.fetched_ts, 0), t.article_id, t.whole_word
+        FROM staged_terms AS t
+        JOIN articles AS a ON a.id = t.article_id
+    ''')
+
+
+def replace_postings(conn, ids_table, postings):
+    """
+    Replace the postings of re-analyzed articles (not committed here)
+
+    Args:
+        conn: Open SQLite connection
+        ids_table: Table with an id column naming the analyzed articles
+        postings: Their new (article_id, term, whole_word) tuples
+    """
+    conn.execute(f'DELETE FROM article_terms WHERE article_id IN (SELECT id FROM {ids_table})')
+    insert_postings(conn, postings)
@@ -0,0 +1,137 @@
+# topic_classifier.py
+"""
+Precompiled per-country topic classifiers
+
+A TopicClassifier merges the global, local and viral taxonomies of one
+country into flat lookup tables once, so classifying an article is a walk
+over the keyword lists that actually matched (see keyword_matcher.py)
+instead of over every topic. Scope, topic and viral subcategory come from
+the same call. Classifiers are cached per country for the life of the
+process, so a long-running scheduler builds each one only once.
+"""
+
+import os
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+# Add parent directory to path for config imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.countries import get_country_config, get_global_topics
+from config.viral_topics import VIRAL_TOPICS
+from keyword_matcher import scan
+
+GLOBAL_SCOPE_THRESHOLD = 2      # Global keyword matches that make an article GLOBAL
+
+Classification = namedtuple('Classification', ['scope', 'topic', 'subcategory'])
+
+
+class TopicClassifier:
+    """
+    Scope, topic and viral subcategory rules of one country
+
+    Topics keep the order the old per-article dicts had (global topics,
+    then new local topics, then viral categories), so ties resolve to the
+    same topic as before.
+    """
+
+    __slots__ = ('country', 'topics', 'topic_tags', 'subcategories', 'subcategory_tags')
+
+    def __init__(self, country=None):
+        """
+        Args:
+            country: Country code, or None for global taxonomies only
+        """
+        config = get_country_config(country) if country else None
+        self.country = country.upper() if config else None
+
+        # Topic name -> keyword_matcher tags feeding its score, in tie-break order
+        tags_by_topic = {}
+        for topic in get_global_topics():
+            tags_by_topic.setdefault(topic, []).append(('global', topic))
+        if config:
+            for topic in config.get('local_topics', {}):
+                tags_by_topic.setdefault(topic, []).append(('local', self.country, topic))
+        for category, subcategories in VIRAL_TOPICS.items():
+            if category == 'Other':
+                continue
+            for subcategory in subcategories:
+                tags_by_topic.setdefault(category, []).append(('viral', category, subcategory))
+        tags_by_topic.pop('Other', None)
+
+        self.topics = tuple(tags_by_topic)
+        self.topic_tags = {}
+        for index, tags in enumerate(tags_by_topic.values()):
+            for tag in tags:
+                self.topic_tags[tag] = self.topic_tags.get(tag, ()) + (index,)
+
+        # Subcategories of the viral taxonomy, in config order
+        self.subcategories = tuple(
+            (category, subcategory)
+            for category, subcategories in VIRAL_TOPICS.items()
+            for subcategory in subcategories
+        )
+        self.subcategory_tags = {
+            ('viral', category, subcategory): index
+            for index, (category, subcategory) in enumerate(self.subcategories)
+        }
+
+    def classify(self, text, hits=None):
+        """
+        Classify one article
+
+        Args:
+            text: Headline + summary
+            hits: keyword_matcher scan of the text, if already computed
+
+        Returns:
+            Classification: scope ('LOCAL' / 'GLOBAL'), topic, and the viral
+            subcategory behind the topic (None when no viral keyword decided it)
+        """
+        if hits is None:
+            hits = scan(text)
+
+        global_matches = 0
+        topic_scores = [0] * len(self.topics)
+        subcategory_scores = [0] * len(self.subcategories)
+        for tag, count in hits.items():
+            if tag[0] == 'global':
+                global_matches += count
+            for index in self.topic_tags.get(tag, ()):
+                topic_scores[index] += count
+            index = self.subcategory_tags.get(tag)
+            if index is not None:
+                subcategory_scores[index] = count
+
+        scope = 'GLOBAL' if global_matches >= GLOBAL_SCOPE_THRESHOLD else 'LOCAL'
+
+        # Highest scoring topic (first in order on a tie)
+        if self.topics:
+            best = max(range(len(self.topics)), key=topic_scores.__getitem__)
+            if topic_scores[best] > 0:
+                topic = self.topics[best]
+                return Classification(scope, topic, self._best_subcategory(subcategory_scores, topic))
+
+        # If no main category matched, use the best subcategory from "Other"
+        subcategory = self._best_subcategory(subcategory_scores, 'Other')
+        return Classification(scope, subcategory or 'Other', subcategory)
+
+    def _best_subcategory(self, scores, category):
+        """Highest scoring subcategory of a viral category with at least one match"""
+        best, best_score = None, 0
+        for index, (parent, subcategory) in enumerate(self.subcategories):
+            if parent == category and scores[index] > best_score:
+                best, best_score = subcategory, scores[index]
+        return best
+
+
+@lru_cache(maxsize=None)
+def _classifier(country):
+    return TopicClassifier(country)
+
+
+def get_classifier(country=None):
+    """The shared classifier of a country (built on first use, then reused)"""
+    config = get_country_config(country) if country else None
+    return _classifier(country.upper() if config else None)
@@ -1,5 +1,5 @@
 # viral_engine.py
-from story_detector import StoryDetector
+from story_detector import StoryDetector, DetectorContext
 from json_generator import JSONChartGenerator
 from datetime import datetime
 import os
@@ -51,18 +51,19 @@ def generate_caption(story, country):
 
     return caption
 
-def create_charts_for_country(country, date_str):
+def create_charts_for_country(country, date_str, context=None):
     """
     Generate JSON charts for a specific country (ECharts format)
 
     Args:
         country: 'UK', 'US', or None for global
         date_str: Date string for output folder
+        context: DetectorContext shared across countries (optional)
 
     Returns:
         int: Number of JSON chart pairs created
     """
-    detector = StoryDetector(country=country)
+    detector = StoryDetector(country=country, context=context)
 
     # Create country-specific output directory
     country_code = country.lower() if country else 'global'
@@ -111,13 +112,16 @@ def generate_viral_content():
 
     total_charts = 0
 
+    # Weekly aggregates are read once and sliced per country
+    context = DetectorContext()
+
     # Generate country-specific charts
     for country in active_countries:
-        count = create_charts_for_country(country, date_str)
+        count = create_charts_for_country(country, date_str, context)
         total_charts += count
 
     # Generate global charts
-    global_count = create_charts_for_country(None, date_str)
+    global_count = create_charts_for_country(None, date_str, context)
     total_charts += global_count
 
     print(f"\n✨ COMPLETE! Total {total_charts} interactive JSON charts generated!")